@@ -0,0 +1,214 @@
+# file: batch.py
+# purpose: runs thousands of independent games at once with numpy, keeping every trial's player positions in arrays so
+#          expected meeting times and their distributions can be measured for any grid size, player count, and protocol
+
+import argparse
+
+import numpy as np
+
+from simulation import PROTOCOLS, PROTOCOL_DIRECTIONS, OFFSETS, Walker, default_starts
+
+BATCH_SIZE = 1 << 16  # trials simulated side by side; finished trials are swapped out for new ones as they finish
+MAX_STEPS = 10000  # trials that have not finished after this many steps are given up on and reported as -1
+
+
+# stands in for the random module when building the move tables, always drawing the same number
+class FixedDraw:
+    def __init__(self, value):
+        self.value = value
+
+    def randint(self, a, b):
+        return self.value
+
+
+# the cell a player ends up in for every (turn, cell, draw), built by running the protocol functions from
+# simulation.py once per entry so the batch engine bounces off the walls exactly like the headless simulation.
+# returns (table, draws): table is indexed by (turn * cells + cell) * draws + draw
+def move_table(width, height, protocol):
+    draws = 4 if protocol == 'random' else 2
+    cells = width * height
+    table = np.zeros(2 * cells * draws, dtype=np.int16)
+
+    for turn in range(2):
+        for cell in range(cells):
+            for draw in range(draws):
+                walker = Walker(cell % width, cell // width, turn)
+                dx, dy = OFFSETS[PROTOCOL_DIRECTIONS[protocol](walker, width, height, FixedDraw(draw))]
+                table[(turn * cells + cell) * draws + draw] = (walker.y + dy) * width + walker.x + dx
+
+    return table, draws
+
+
+# run `trials` independent games and return (steps, moves), where steps[t] is the step on which everyone in trial t
+# had found each other (-1 if it never happened) and moves[t, p] is how many moves player p made before being found.
+# the rules are the same as simulation.Simulation: only group leaders pick a direction, followers stay with their
+# leader, and walkers meet by ending a step in the same cell or by swapping cells
+def run_batch(width, height, protocol='random', player_num=2, trials=10000, starts=None, turns=None,
+              max_steps=MAX_STEPS, seed=None):
+    if protocol not in PROTOCOLS:
+        raise ValueError('unknown protocol: {}'.format(protocol))
+    if starts is None:
+        starts = default_starts(width, height, player_num)
+    if turns is None:
+        turns = [index % 2 for index in range(player_num)]
+
+    rng = np.random.default_rng(seed)
+    table, draws = move_table(width, height, protocol)
+    cells = width * height
+    players = np.arange(player_num, dtype=np.int8)[:, None]
+    dtype = np.int16 if len(table) < 2 ** 15 else np.int32  # cells are stored in the smallest type the table fits
+    table = table.astype(dtype)
+    groups = player_num > 2  # with two players the first meeting ends the game, so nobody ever follows anyone
+
+    steps = np.full(trials, -1, dtype=np.int64)
+    moves = np.zeros((trials, player_num), dtype=np.int64)
+
+    # the starting state every new trial is copied from, one row per player and one column per trial
+    start_cell = np.array([y * width + x for x, y in starts], dtype=dtype)[:, None]
+    start_turn = np.array(turns, dtype=dtype)[:, None] * cells  # kept pre-multiplied to index the move table
+    start_root, start_found, _ = check_meetings(start_cell, None, players.copy(),
+                                                np.zeros((player_num, 1), dtype=bool))
+    if (start_root == 0).all():  # everyone was placed in the same cell, so every trial is over before it starts
+        steps[:] = 0
+        return steps, moves
+
+    # the working set: trial ids, the step each trial joined on, and the per-player state of each trial
+    ids = np.zeros(0, dtype=np.int64)
+    born = np.zeros(0, dtype=np.int64)
+    cell = np.zeros((player_num, 0), dtype=dtype)
+    turn = np.zeros((player_num, 0), dtype=dtype)
+    root = np.zeros((player_num, 0), dtype=np.int8)
+    found = np.zeros((player_num, 0), dtype=bool)
+    counted = np.zeros((player_num, 0), dtype=np.int32)
+    alive = np.zeros(0, dtype=bool)
+
+    next_trial = 0
+    step = 0
+    while True:
+        # finished trials are dropped and new ones fill their place, so the arrays stay full until the last trials
+        if len(ids) - np.count_nonzero(alive) >= len(ids) // 8:
+            ids, born, cell, turn, root, found, counted = (ids[alive], born[alive], cell[:, alive], turn[:, alive],
+                                                           root[:, alive], found[:, alive], counted[:, alive])
+            count = min(BATCH_SIZE - len(ids), trials - next_trial)
+            if count > 0:
+                ids = np.concatenate([ids, np.arange(next_trial, next_trial + count)])
+                born = np.concatenate([born, np.full(count, step)])
+                cell = np.concatenate([cell, np.repeat(start_cell, count, axis=1)], axis=1)
+                turn = np.concatenate([turn, np.repeat(start_turn, count, axis=1)], axis=1)
+                root = np.concatenate([root, np.repeat(start_root, count, axis=1)], axis=1)
+                found = np.concatenate([found, np.repeat(start_found, count, axis=1)], axis=1)
+                counted = np.concatenate([counted, np.zeros((player_num, count), dtype=np.int32)], axis=1)
+                next_trial += count
+            alive = np.ones(len(ids), dtype=bool)
+        if len(ids) == 0:
+            break
+        step += 1
+
+        # every player in every trial draws a direction in one call; only group leaders and lost players use it
+        draw = np.frombuffer(rng.bytes(cell.size), dtype=np.uint8).reshape(cell.shape) & (draws - 1)
+        previous = cell
+        if protocol == 'random':
+            moved = table[cell * draws + draw]
+        else:
+            moved = table[(turn + cell) * draws + draw]
+
+        if groups:
+            # followers take the cell their group leader moved to, and only leaders flip their 'every other' turn
+            mover = root == players
+            columns = np.arange(cell.shape[1])
+            cell = moved[root, columns]
+            if protocol == 'every other':
+                turn = np.where(mover, cells - turn, turn)
+            root, found, merged = check_meetings(cell, previous, root, found)
+            if len(merged):
+                cell[:, merged] = cell[root[:, merged], merged]
+            counted += mover & ~found  # a step only counts for players that were still lost at the end of it
+            over = alive & ~root.any(axis=0)
+        else:
+            # with two players everyone moves every step and the first meeting ends the game, so the meeting can be
+            # checked directly and both players made one move fewer than the steps it took
+            cell = moved
+            if protocol == 'every other':
+                turn = cells - turn
+            over = alive & ((cell[0] == cell[1]) | ((cell[0] == previous[1]) & (cell[1] == previous[0])))
+
+        # record the trials that finished on this step; their columns are ignored until they are dropped
+        if over.any():
+            age = step - born[over]
+            steps[ids[over]] = age
+            moves[ids[over]] = counted[:, over].T if groups else (age - 1)[:, None]
+            alive &= ~over
+
+        # trials are added in order, so the first one is always the oldest
+        if step - born[0] >= max_steps:
+            given_up = alive & (step - born >= max_steps)
+            moves[ids[given_up]] = counted[:, given_up].T if groups else (step - born[given_up])[:, None]
+            alive &= ~given_up
+
+    return steps, moves
+
+
+# compare every pair of players in every trial at once; pairs from different groups that share a cell or swapped
+# cells merge into one group led by the lower numbered leader, and both players are marked as found.
+# returns the new roots and found flags along with the columns (trials) in which groups merged
+def check_meetings(cell, previous, root, found):
+    player_num = len(cell)
+    merged = []
+
+    for i in range(player_num):
+        for j in range(i + 1, player_num):
+            met = cell[i] == cell[j]
+            if previous is not None:
+                met |= (cell[i] == previous[j]) & (cell[j] == previous[i])
+            met &= root[i] != root[j]  # players in the same group always share a cell
+            if not met.any():
+                continue
+
+            # merges are rare, so only the trials where one happened are touched
+            columns = np.flatnonzero(met)
+            found[i, columns] = True
+            found[j, columns] = True
+
+            first = root[i, columns]
+            second = root[j, columns]
+            leader = np.minimum(first, second)
+            follower = np.maximum(first, second)
+            groups = root[:, columns]
+            root[:, columns] = np.where(groups == follower, leader, groups)
+            merged.append(columns)
+
+    merged = np.unique(np.concatenate(merged)) if merged else np.zeros(0, dtype=np.intp)
+    return root, found, merged
+
+
+# mean, median, and 95th percentile of the steps it took the finished trials to meet
+def summarize(steps):
+    finished = steps[steps >= 0]
+    if len(finished) == 0:
+        return {'trials': len(steps), 'finished': 0, 'mean': float('nan'), 'median': float('nan'),
+                'p95': float('nan')}
+
+    return {'trials': len(steps), 'finished': len(finished), 'mean': float(finished.mean()),
+            'median': float(np.median(finished)), 'p95': float(np.percentile(finished, 95))}
+
+
+# how often each meeting step happened: distribution(steps)[k] is the fraction of finished trials that met on step k
+def distribution(steps):
+    finished = steps[steps >= 0]
+    if len(finished) == 0:
+        return np.zeros(0)
+    return np.bincount(finished) / len(finished)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo estimate of how long it takes players to meet.')
+    parser.add_argument('--width', type=int, default=5)
+    parser.add_argument('--height', type=int, default=5)
+    parser.add_argument('--players', type=int, default=2)
+    parser.add_argument('--protocol', choices=PROTOCOLS, default='random')
+    parser.add_argument('--trials', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    steps, moves = run_batch(args.width, args.height, args.protocol, args.players, args.trials, seed=args.seed)
+    print(summarize(steps))
@@ -0,0 +1,231 @@
+# file: benchmark.py
+# purpose: measures how long frames take to make without a window, by driving the game through the menu and the level
+#          with scripted clicks and key presses for every level, player count, and grid size. every frame is the
+#          game's own frame (Game.frame), with the scripted input going through the event queue and the keyboard. the time each part of a frame took
+#          (updating the level, drawing the woods, the overlay, and sending the frame to the display) is saved as
+#          percentiles to a json file, and can be compared against a saved baseline to catch anything that got slower
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # frames are drawn the same way, just never shown
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+import pygame
+
+import level as level_module
+import streams
+from level import Level
+from main import Game
+from overlay import Overlay
+from settings import *
+
+LEVELS = [1, 2, 3]
+PLAYER_COUNTS = [2, 3, 4]
+MIN_SIZE = 2
+SIZES = list(range(MIN_SIZE, MAX_GRID_SIZE + 1))
+LEVEL_BUTTONS = {1: 'K-2', 2: '3-5', 3: '6-8'}  # the title screen button for each level
+
+PHASES = ['update', 'draw', 'overlay', 'display', 'frame']  # the parts of a frame that are timed, and the whole frame
+PERCENTILES = [50, 90, 99]
+COMPARED = ['p50', 'p90']  # the statistics compared against a baseline; the slowest frames are too noisy to compare
+THRESHOLD = 0.2  # how much slower than the baseline a phase can get before it counts as a regression
+MIN_DIFFERENCE = 0.05  # milliseconds a phase has to get slower by as well, so tiny phases don't flag on noise
+
+# the methods that make up each timed phase. the update phase is whatever else the game did that frame
+TIMED = {'draw': [(Level, 'render_grid'), (Level, 'render_players')], 'overlay': [(Overlay, 'display')],
+         'display': [(pygame.display, 'update')]}
+
+spent = {}  # phase -> seconds spent in it so far this frame
+SCANCODES = {pygame.K_RETURN: pygame.KSCAN_RETURN}  # where each key the script presses is in pygame.key.get_pressed
+held = set()  # the keys the script is holding down
+
+
+# wrap a method so the time spent in it is added to a phase
+def timed(phase, method):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            spent[phase] = spent.get(phase, 0) + time.perf_counter() - start
+    return wrapper
+
+
+# time the phases, and have the keyboard report the keys the script holds down instead of the real ones
+def instrument():
+    for phase, methods in TIMED.items():
+        for owner, name in methods:
+            setattr(owner, name, timed(phase, getattr(owner, name)))
+    pygame.key.get_pressed = lambda: pygame.key.ScancodeWrapper(
+        tuple(code in {SCANCODES[key] for key in held} for code in range(512)))
+
+
+# hold down exactly the given keys from the next frame on, posting a key event for each key that goes down or up
+def hold(*keys):
+    for key in held - set(keys):
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key, scancode=SCANCODES[key], mod=0, unicode=''))
+    for key in set(keys) - held:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, scancode=SCANCODES[key], mod=0, unicode=''))
+    held.clear()
+    held.update(keys)
+
+
+# post a click on a named button on a menu screen (the one being shown, unless another is named)
+def click(menu, name, screen_name=None):
+    screen = menu.get_screen(screen_name or menu.screen)
+    button = next(widget for widget in screen.widgets if getattr(widget, 'name', None) == name)
+    pygame.event.post(pygame.event.Event(screen.trigger, pos=button.rect.center, button=1))
+
+
+# click through the menu screen being shown towards starting a level with the given settings
+def menu_input(menu, level, players, size):
+    if menu.screen == 'title':
+        click(menu, LEVEL_BUTTONS[level])
+    elif menu.screen == 'players' and menu.playerNum != players:
+        click(menu, 'fewer' if menu.playerNum > players else 'more')
+    elif menu.screen == 'size' and menu.width != size:
+        click(menu, 'narrower' if menu.width > size else 'wider')
+    elif menu.screen == 'size' and menu.height != size:
+        click(menu, 'shorter' if menu.height > size else 'taller')
+    else:
+        click(menu, 'confirm')
+
+
+# what to do in the level: confirm the instructions, hold enter to place each player where they stand, and play again
+# whenever a game ends
+def level_input(level):
+    menu = level.menu
+    if menu.instruction:
+        click(menu, 'confirm', 'instructions')
+    elif menu.over:
+        click(menu, 'reset', 'over')
+    if not menu.instruction and any(player.selected and not player.placed for player in level.players):
+        hold(pygame.K_RETURN)
+    else:
+        hold()
+
+
+# the value below which `percentile` percent of the sorted values fall
+def percentile(values, percent):
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+# percentiles, mean, and worst of a phase's frame times, in milliseconds
+def summarize(times):
+    times = sorted(time_taken * 1000 for time_taken in times)
+    summary = {'p{}'.format(percent): round(percentile(times, percent), 4) for percent in PERCENTILES}
+    summary['mean'] = round(sum(times) / len(times), 4)
+    summary['max'] = round(times[-1], 4)
+    return summary
+
+
+# play one configuration for `frames` frames of the level (not counting the menu screens before it), with every frame
+# taking `dt` seconds of game time
+# returns each phase's summary
+def run_configuration(game, level, players, size, frames, dt):
+    game.level = Level(False)
+    pygame.event.clear()
+    hold()
+    times = {phase: [] for phase in PHASES}
+    while len(times['frame']) < frames:
+        in_level = game.level.menu.started and game.level.players_created
+        spent.clear()
+
+        start = time.perf_counter()
+        game.frame(0, dt)  # never sleeps, since the next frame's input is always ready
+        finished = time.perf_counter()
+
+        if in_level:
+            drawn = sum(spent.get(phase, 0) for phase in ('draw', 'overlay', 'display'))
+            for phase in ('draw', 'overlay', 'display'):
+                times[phase].append(spent.get(phase, 0))
+            times['update'].append(finished - start - drawn)
+            times['frame'].append(finished - start)
+
+        menu = game.level.menu
+        if menu.screen is not None:
+            menu_input(menu, level, players, size)
+        else:
+            level_input(game.level)
+
+    return {phase: summarize(phase_times) for phase, phase_times in times.items()}
+
+
+# benchmark every configuration, with every game seeded from `seed` so each run plays the same games
+def benchmark(levels, player_counts, sizes, frames, dt, seed):
+    instrument()
+    level_module.RECORD_REPLAYS = False  # the games played while benchmarking aren't saved as replays
+    game = Game()
+    game.pacer.fps = 0  # frames are made as fast as they can be, instead of capped to the frame rate
+    game.pacer.pause_unfocused = False
+    k2_settings = game.level.menu.playerNum, game.level.menu.width  # K-2 has no settings screens, so it's only played
+                                                                    # with the menu's default settings
+    results = []
+    for level in levels:
+        for players in player_counts:
+            for size in sizes:
+                if level == 1 and (players, size) != k2_settings:
+                    continue
+                streams.session.update(seed=seed, games=0)
+                phases = run_configuration(game, level, players, size, frames, dt)
+                results.append({'level': level, 'players': players, 'size': size, 'phases': phases})
+                print('level {}, {} players, {} x {}: frame p50 {:.3f} ms, p99 {:.3f} ms'.format(
+                    level, players, size, size, phases['frame']['p50'], phases['frame']['p99']))
+    pygame.quit()
+
+    return {'settings': {'frames': frames, 'dt': dt, 'seed': seed, 'python': platform.python_version(),
+                         'pygame': pygame.version.ver, 'platform': platform.platform()},
+            'results': results}
+
+
+# the phases that got slower than the baseline, as (configuration, phase, statistic, baseline ms, new ms) rows.
+# configurations that aren't in both are skipped
+def compare(baseline, results, threshold=THRESHOLD, min_difference=MIN_DIFFERENCE):
+    def key(result):
+        return result['level'], result['players'], result['size']
+
+    before = {key(result): result['phases'] for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        if key(result) not in before:
+            continue
+        for phase, summary in result['phases'].items():
+            for statistic in COMPARED:
+                old = before[key(result)].get(phase, {}).get(statistic)
+                new = summary[statistic]
+                if old is not None and new > old * (1 + threshold) and new - old > min_difference:
+                    regressions.append((key(result), phase, statistic, old, new))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure frame times without a window over every level, player '
+                                                 'count, and grid size.')
+    parser.add_argument('output', help='json file the results are saved to')
+    parser.add_argument('--baseline', help='json results from an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='how much slower than the baseline counts as a regression (0.2 is 20%%)')
+    parser.add_argument('--levels', type=int, nargs='+', choices=LEVELS, default=LEVELS)
+    parser.add_argument('--players', type=int, nargs='+', default=PLAYER_COUNTS)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--frames', type=int, default=1200, help='frames of the level measured per configuration')
+    parser.add_argument('--dt', type=float, default=1 / TARGET_FPS, help='seconds of game time every frame takes')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    measured = benchmark(args.levels, args.players, args.sizes, args.frames, args.dt, args.seed)
+    with open(args.output, 'w') as file:
+        json.dump(measured, file, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = compare(json.load(file), measured, args.threshold)
+        for (level, players, size), phase, statistic, old, new in found:
+            print('slower: level {}, {} players, {} x {}: {} {} {:.3f} -> {:.3f} ms'.format(
+                level, players, size, size, phase, statistic, old, new))
+        print('{} regressions against {}'.format(len(found), args.baseline))
+        sys.exit(1 if found else 0)
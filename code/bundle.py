@@ -0,0 +1,64 @@
+# file: bundle.py
+# purpose: packs every character atlas and overlay icon into one asset bundle file of raw pixels, with an index of
+#          where each one is. the game maps the bundle into memory and draws from those pixels directly, instead of
+#          opening and decoding every png when it starts. run 'python bundle.py' from the code folder again after
+#          changing anything in the graphics folder
+
+import argparse
+import json
+import os
+import struct
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # packing needs a display to convert the images for, but not a window
+import pygame
+
+import support
+
+
+# pad the bytes to a multiple of the bundle alignment
+def aligned(data):
+    return data + bytes(-len(data) % support.BUNDLE_ALIGN)
+
+
+# pack the graphics named in the manifest into a bundle at path
+def build(path):
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    index = {'manifest': support.graphics_manifest(), 'characters': {}, 'icons': {}}
+    pixels = []  # every image's pixels, in the order they go in the bundle
+    offset = 0  # where the next image's pixels go, counted from the start of the pixels
+
+    def add(image):
+        nonlocal offset
+        data = aligned(pygame.image.tobytes(image, support.BUNDLE_FORMAT))
+        pixels.append(data)
+        entry = [offset, image.get_width(), image.get_height()]
+        offset += len(data)
+        return entry
+
+    for name in index['manifest']['characters']:
+        atlas, areas = support.pack_character(name)
+        index['characters'][name] = {'atlas': add(atlas), 'frames': areas}
+    for name, icon in index['manifest']['icons'].items():
+        index['icons'][name] = add(support.load_image(icon))
+
+    index_data = json.dumps(index).encode()
+    with open(path, 'wb') as file:
+        file.write(aligned(struct.pack(support.BUNDLE_HEADER, support.BUNDLE_MAGIC, len(index_data)) + index_data))
+        for data in pixels:
+            file.write(data)
+
+    pygame.quit()
+    return offset
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pack the character frames and overlay icons into one asset bundle.')
+    parser.add_argument('output', nargs='?', default=support.BUNDLE_PATH, help='bundle file to write')
+    args = parser.parse_args()
+
+    size = build(args.output)
+    print('packed {} characters and {} icons ({} KB of pixels) into {}'.format(
+        len(support.graphics_manifest()['characters']), len(support.graphics_manifest()['icons']), size // 1024,
+        args.output))
@@ -0,0 +1,186 @@
+# file: camera.py
+# purpose: the view into the woods shown in the play area. small grids fit the play area at full size like they always
+#          have, while large grids can be scrolled and zoomed, and only what is inside the view gets drawn
+
+import pygame
+from settings import *
+from states import animation
+
+
+class Camera:
+    def __init__(self, width, height):
+        self.viewport = pygame.Rect(0, 0, PLAY_SIZE, PLAY_SIZE)  # the part of the screen the woods are drawn in
+        self.scaled = {}  # player images scaled to the current zoom, so each frame is only scaled once
+        self.blocks = {}  # color -> the block players of that color are drawn as when zoomed far out
+        self.drag = False  # true while the right mouse button is held down to drag the view around
+        self.scale = None  # set by resize
+        self.resize(width, height)
+
+    # the grid changed size (in pixels at full zoom), so zoom out until it all fits, or to full size if it already did
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.min_scale = min(1, PLAY_SIZE / width, PLAY_SIZE / height)  # zoomed out far enough to see the whole grid
+        self.fit()
+
+    # show the whole grid
+    def fit(self):
+        self.set_scale(self.min_scale)
+        self.x = 0
+        self.y = 0
+        self.clamp()
+
+    # how many screen pixels one grid pixel takes up
+    def set_scale(self, scale):
+        scale = max(self.min_scale, min(1, scale))
+        if scale != self.scale:
+            self.scale = scale
+            self.scaled = {}  # images scaled to the old zoom are no use anymore
+            self.blocks = {}
+
+    # the size of one grid cell on the screen
+    def cell_size(self):
+        return TILE_SIZE * self.scale
+
+    # true when cells are big enough to draw the grid lines and player sprites; otherwise each player is a block
+    def detailed(self):
+        return self.cell_size() >= LOD_CELL_SIZE
+
+    # keep the view on the grid; a grid narrower or shorter than the view stays in the top left corner
+    def clamp(self):
+        self.x = max(0, min(self.width - self.viewport.width / self.scale, self.x))
+        self.y = max(0, min(self.height - self.viewport.height / self.scale, self.y))
+
+    # zoom in (factor > 1) or out (factor < 1), keeping the grid point under the screen position `pivot` where it is
+    def zoom(self, factor, pivot):
+        world_x, world_y = self.to_world(pivot)
+        self.set_scale(self.scale * factor)
+        self.x = world_x - (pivot[0] - self.viewport.x) / self.scale
+        self.y = world_y - (pivot[1] - self.viewport.y) / self.scale
+        self.clamp()
+
+    # move the view by a number of screen pixels
+    def scroll(self, dx, dy):
+        self.x += dx / self.scale
+        self.y += dy / self.scale
+        self.clamp()
+
+    # center the view on a grid position if it has gone out of view, like a player being placed far from the corner
+    def follow(self, pos):
+        if not self.visible().collidepoint(pos):
+            self.x = pos[0] - self.viewport.width / self.scale / 2
+            self.y = pos[1] - self.viewport.height / self.scale / 2
+            self.clamp()
+
+    # what the camera is looking at; the grid only needs drawing again when this changes
+    def view(self):
+        return self.width, self.height, self.scale, self.x, self.y
+
+    # the part of the grid that is in view, in grid pixels
+    def visible(self):
+        return pygame.Rect(int(self.x), int(self.y), int(self.viewport.width / self.scale) + 1,
+                           int(self.viewport.height / self.scale) + 1)
+
+    # grid pixels to screen pixels
+    def to_screen(self, pos):
+        return (self.viewport.x + (pos[0] - self.x) * self.scale,
+                self.viewport.y + (pos[1] - self.y) * self.scale)
+
+    # screen pixels to grid pixels
+    def to_world(self, pos):
+        return (self.x + (pos[0] - self.viewport.x) / self.scale,
+                self.y + (pos[1] - self.viewport.y) / self.scale)
+
+    # mouse wheel zooms around the mouse, the right mouse button drags the view, w/a/s/d scroll it, and f shows the
+    # whole grid again. the arrow keys are left alone since they place the players
+    def input(self, event_list, dt):
+        for event in event_list:
+            if event.type == pygame.MOUSEWHEEL and self.viewport.collidepoint(pygame.mouse.get_pos()):
+                self.zoom(ZOOM_STEP ** event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                self.drag = self.viewport.collidepoint(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 3:
+                self.drag = False
+            elif event.type == pygame.MOUSEMOTION and self.drag:
+                self.scroll(-event.rel[0], -event.rel[1])
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                self.fit()
+
+        keys = pygame.key.get_pressed()
+        distance = SCROLL_SPEED * dt
+        self.scroll((keys[pygame.K_d] - keys[pygame.K_a]) * distance, (keys[pygame.K_s] - keys[pygame.K_w]) * distance)
+
+    # draw the grid lines that are in view, or just the grid's outline when zoomed too far out to see the cells
+    def draw_grid(self, surface):
+        white = (255, 255, 255)
+        left, top = self.to_screen((0, 0))
+        right, bottom = self.to_screen((self.width, self.height))
+
+        if not self.detailed():
+            pygame.draw.rect(surface, white, (left, top, right - left + 2, bottom - top + 2), 1)
+            return
+
+        thickness = 2 if self.scale == 1 else 1
+        visible = self.visible()
+        first_column = max(0, visible.left // TILE_SIZE)
+        last_column = min(self.width, visible.right) // TILE_SIZE
+        first_row = max(0, visible.top // TILE_SIZE)
+        last_row = min(self.height, visible.bottom) // TILE_SIZE
+        top = max(top, self.viewport.top)
+        bottom = min(bottom, self.viewport.bottom)
+        left = max(left, self.viewport.left)
+        right = min(right, self.viewport.right)
+
+        for row in range(first_row, last_row + 1):
+            y = self.to_screen((0, row * TILE_SIZE))[1]
+            pygame.draw.line(surface, white, (left + 1, y), (right + 1, y), thickness)
+        for column in range(first_column, last_column + 1):
+            x = self.to_screen((column * TILE_SIZE, 0))[0]
+            pygame.draw.line(surface, white, (x, top + 1), (x, bottom + 1), thickness)
+
+    # set the image and screen rect each player sprite is drawn with, from where the player states have them: their
+    # animation frame scaled to the zoom, or a block of their color per cell when zoomed too far out for the sprites to
+    # be seen. players out of view are hidden, and only players whose image or rect changed are marked dirty so they
+    # get drawn again
+    def place_players(self, players, states):
+        visible = self.visible().inflate(TILE_SIZE * 2, TILE_SIZE * 2)
+        detailed = self.detailed()
+
+        for index, player in enumerate(players):
+            x, y = states.pos_x[index], states.pos_y[index]
+            shown = visible.collidepoint(x, y)
+            image = player.image
+            rect = player.rect
+            if shown and detailed:
+                frames = player.animations[animation(states.facing[index], states.sliding[index])]
+                image = self.scale_image(frames[int(states.frame[index]) % len(frames)])
+                x, y = self.to_screen((round(x), round(y)))
+                rect = image.get_rect(center=(round(x), round(y)))
+            elif shown:
+                image = self.block(player.color)
+                x, y = self.to_screen((x - TILE_SIZE / 2, y - TILE_SIZE / 2))
+                rect = image.get_rect(topleft=(int(x), int(y)))
+
+            if image is not player.image or rect != player.rect:
+                player.image = image
+                player.rect = rect
+                player.dirty = 1
+            player.visible = int(shown)  # marks the player dirty when it changes
+
+    # the block a player of this color is drawn as when zoomed far out, never smaller than a few pixels so players can
+    # still be spotted
+    def block(self, color):
+        if color not in self.blocks:
+            size = max(3, int(self.cell_size()))
+            self.blocks[color] = pygame.Surface((size, size)).convert()
+            self.blocks[color].fill(color)
+        return self.blocks[color]
+
+    # a player image at the current zoom; images are scaled once and kept until the zoom changes
+    def scale_image(self, image):
+        if self.scale == 1:
+            return image
+        if image not in self.scaled:
+            size = max(1, round(image.get_width() * self.scale)), max(1, round(image.get_height() * self.scale))
+            self.scaled[image] = pygame.transform.smoothscale(image, size)
+        return self.scaled[image]
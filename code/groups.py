@@ -0,0 +1,42 @@
+# file: groups.py
+# purpose: disjoint-set (union-find) structure that keeps track of which players have found each other. the lowest
+#          numbered player of each group is its leader, matching who leads in the game
+
+class Groups:
+    def __init__(self, count):
+        self.parent = list(range(count))  # each player points towards the leader of their group
+        self.members = {index: [index] for index in range(count)}  # leader -> every player in the leader's group
+
+    # the leader of a player's group; the path is shortened on the way so later lookups are quicker
+    def find(self, index):
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    # merge the groups of two players that found each other, with the lower numbered leader leading the merged group
+    # returns (leader, follower) for the two old group leaders, or None if they were already in the same group
+    def union(self, first, second):
+        first = self.find(first)
+        second = self.find(second)
+        if first == second:
+            return None
+
+        leader = min(first, second)
+        follower = max(first, second)
+        self.parent[follower] = leader
+
+        # add the smaller member list onto the larger one so merging stays cheap however the groups are sized
+        joined = self.members.pop(follower)
+        kept = self.members[leader]
+        if len(joined) > len(kept):
+            joined, kept = kept, joined
+        kept.extend(joined)
+        self.members[leader] = kept
+
+        return leader, follower
+
+    # the amount of groups left
+    def count(self):
+        return len(self.members)
@@ -0,0 +1,96 @@
+# file: labels.py
+# purpose: text that is only rendered again when the value it shows changes. numbers are built from a glyph atlas of
+#          pre-rendered digits instead of asking the font to render them, and fonts are opened once and shared
+
+import pygame
+
+DIGITS = '0123456789:'  # the characters in a glyph atlas; the timer only ever needs digits and colons
+FONT_FACE = 'freesansbold.ttf'  # the font all the game's text is in
+
+fonts = {}  # (face, size) -> font, opened the first time it is asked for and shared by the menu and the overlay
+font_stats = {'hits': 0, 'misses': 0}  # how many times a font was asked for that was already open, and that wasn't
+atlases = {}  # (font, color) -> glyph atlas, shared by every number label drawn in that font and color
+
+
+# the font in the given face and size, only opening and reading the font file the first time it is asked for
+def load_font(size, face=FONT_FACE):
+    if (face, size) in fonts:
+        font_stats['hits'] += 1
+    else:
+        font_stats['misses'] += 1
+        fonts[(face, size)] = pygame.font.Font(face, size)
+    return fonts[(face, size)]
+
+
+# every digit rendered once side by side on one surface, along with where each one is
+class GlyphAtlas:
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+
+        glyphs = [font.render(character, True, color) for character in DIGITS]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+        self.surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height), pygame.SRCALPHA)
+        self.areas = {}  # character -> the part of the atlas surface it was drawn in
+
+        x = 0
+        for character, glyph in zip(DIGITS, glyphs):
+            self.surface.blit(glyph, (x, 0))
+            self.areas[character] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+
+    # build the text out of glyphs; anything the atlas doesn't have (like the 'day' in a very long timer) is left to
+    # the font
+    def render(self, text):
+        if any(character not in self.areas for character in text):
+            return self.font.render(text, True, self.color)
+
+        surface = pygame.Surface((sum(self.areas[character].width for character in text), self.height),
+                                 pygame.SRCALPHA)
+        x = 0
+        for character in text:
+            surface.blit(self.surface, (x, 0), self.areas[character])
+            x += self.areas[character].width
+        return surface
+
+
+# the glyph atlas for a font and color, built the first time it is asked for
+def glyph_atlas(font, color):
+    if (font, color) not in atlases:
+        atlases[(font, color)] = GlyphAtlas(font, color)
+    return atlases[(font, color)]
+
+
+# a piece of text on the screen, placed with a pygame rect anchor like center=(x, y) or midleft=(x, y)
+class Label:
+    def __init__(self, font, color, value='', **anchor):
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.value = None  # what the label shows; None until it is first set
+        self.rect = pygame.Rect(0, 0, 0, 0)  # where the label was last placed
+        self.set(value)
+
+    # show a new value, rendering it only if it is different from what is shown already
+    # returns the part of the screen that changed (covering both the old and the new text), or None if nothing did
+    def set(self, value):
+        if value == self.value:
+            return None
+
+        old = self.rect
+        self.value = value
+        self.image = self.render('{}'.format(value))
+        self.rect = self.image.get_rect(**self.anchor)
+        return self.rect.union(old) if old.width else self.rect.copy()
+
+    def render(self, text):
+        return self.font.render(text, True, self.color)
+
+    def draw(self, surface):
+        surface.blit(self.image, self.rect)
+
+
+# a label for numbers and times, built from the font's glyph atlas
+class NumberLabel(Label):
+    def render(self, text):
+        return glyph_atlas(self.font, self.color).render(text)
@@ -2,12 +2,23 @@
 # purpose: backbone of the game that initializes and updates the menu, players, and overlay as needed, and keeps track
 #          of other game settings as needed
 
+import threading
+import time
+
 import pygame
 
 from settings import *
 from player import Player
+from states import PlayerStates
+from schedule import Scheduler, STEP, ARRIVE
+from camera import Camera
 from overlay import Overlay
 from menu import Menu
+from widgets import Slider
+from profiler import profiler
+from simulation import Simulation, STEP_TIME, default_starts
+from streams import next_game_seed
+import replay
 
 
 class Level:
@@ -16,26 +27,43 @@ class Level:
         self.display_surface = pygame.display.get_surface()  # the display's surface (where everything will be drawn)
 
         # sprite groups
-        self.all_sprites = pygame.sprite.Group()  # group containing all sprites
+        self.all_sprites = pygame.sprite.LayeredDirty()  # group containing all sprites, which only draws the sprites
+                                                         # that changed over the background
 
         # the default grid dimensions
         self.width = 5 * 64
         self.height = 5 * 64
 
         self.menu = Menu()  # create the menu that the player will navigate through to start the game
+        self.camera = Camera(self.width, self.height)  # the view into the woods, for grids too big to show at once
+        self.all_sprites.set_clip(self.camera.viewport)  # sprites never draw over the overlay
+        self.background = None  # the grid and the lines around the overlay, drawn once and blitted every frame
+        self.background_view = None  # the camera view the background was drawn for
+        self.redraw = True  # true when the whole screen has to be drawn on the next frame instead of just what changed
 
         self.all_found = False  # set to true once all players are found
         self.reinit = reinit  # if the user exits to the main menu, the game will be reinitialized so this is set to
                               # true; used to reset the level before updating the menu
         self.players_created = False  # true once all player objects have been created
-
-        # these help keep track of which players have found each other and to determine who should lead
-        self.p12 = False  # true when player 1 and player 2 meet
-        self.p13 = False  # true when player 1 and player 3 meet
-        self.p14 = False  # true when player 1 and player 4 meet
-        self.p23 = False  # true when player 2 and player 3 meet
-        self.p24 = False  # true when player 2 and player 4 meet
-        self.p34 = False  # true when player 3 and player 4 meet
+        self.players = []  # every player in the level, in player number order
+        self.states = PlayerStates()  # where every player is and how they are drawn, which the players are views of
+
+        self.simulation = None  # the headless simulation the players are drawn from, created once they are all placed
+        self.seed = None  # the seed for the random numbers of the game being played, shown in the overlay
+        self.clock = 0  # the game time of the game being played, which goes by `speed` times faster than real time
+        self.scheduler = Scheduler()  # the simulation steps and the ends of slides coming up, by game time
+        self.speed = 1  # how many times faster than normal the game is played
+        # how far the game went in the last SPEED_WINDOW seconds, to show how fast it really goes when the simulation
+        # can't keep up: the real time measured, the game time played in it, and the game time dropped
+        self.real_time = 0
+        self.played_time = 0
+        self.dropped_time = 0
+        self.solver = None  # the background thread working out the expected time of the game being played
+        self.expected = None  # (game settings, expected time) the solver worked out
+        self.recording = None  # the game being played, recorded so it can be saved as a replay when it ends
+        self.replay = None  # the recording being played back, if the game is a replay
+        self.replay_to_end = False  # true when the replay skips straight to how the game ended
+        self.timeline = None  # the slider under the grid for moving through a replay
 
         self.reset = False  # true when the user clicks the reset button
         self.times_reset = 0  # this is used to help determine average run times over multiple resets
@@ -55,164 +83,375 @@ class Level:
 
     # update different aspects of the level once the game is started
     def update(self):
-        # updates the players' wandering protocols when a different once is selected in the menu
-        for player in self.players:
-            player.selected_protocol = self.menu.protocols[self.menu.pro_index]
+        # updates the simulation's wandering protocol when a different once is selected in the menu
+        if self.simulation is not None:
+            self.simulation.protocol = self.menu.protocols[self.menu.pro_index]
 
         # board, overlay, and player settings need to be updated when a reset happens to adjust for user input
         if self.reset:
+            if (self.width, self.height) != (self.menu.width * 64, self.menu.height * 64):
+                self.background = None  # the grid changed size, so it has to be drawn again
             self.width = self.menu.width * 64
             self.height = self.menu.height * 64
             self.overlay.selected_pro = self.menu.protocols[self.menu.pro_index]
+            self.overlay.seed = self.seed
+            self.camera.resize(self.width, self.height)
 
-            self.player1.turn = 0
-            self.player1.board_width = self.width
-            self.player1.board_height = self.height
-            self.player1.start_pos = pygame.math.Vector2(32, 32)
-            self.player2.turn = 1
-            self.player2.board_width = self.width
-            self.player2.board_height = self.height
-            self.player2.start_pos = pygame.math.Vector2(self.width - 32, self.height - 32)
-            if self.menu.playerNum >= 3:
-                self.player3.turn = 0
-                self.player3.board_width = self.width
-                self.player3.board_height = self.height
-                self.player3.start_pos = pygame.math.Vector2(self.width - 32, 32)
-            if self.menu.playerNum == 4:
-                self.player4.turn = 1
-                self.player4.board_width = self.width
-                self.player4.board_height = self.height
-                self.player4.start_pos = pygame.math.Vector2(32, self.height - 32)
+            starts = self.start_positions()
+            for index, player in enumerate(self.players):
+                self.states.start_turn[index] = index % 2
+                self.states.set_start(index, starts[index])
+                player.board_width = self.width
+                player.board_height = self.height
+
+    # the cells players start in before the user places them: the four corners first, then the rest of the players
+    # spread out over the grid
+    def start_positions(self):
+        return default_starts(self.width // 64, self.height // 64, self.menu.playerNum)
 
     # only run once to create all the players needed for the level
-    # players are automatically placed for K-2, but for the other levels the players are not placed and player1 is
-    # selected to be placed first
+    # players are automatically placed for K-2, but for the other levels the players are not placed and the first
+    # player is selected to be placed first. players past the fourth reuse the four player graphics in turn
     # the overlay is also created using the player settings
     def create_players(self):
         self.width = self.menu.width * 64
         self.height = self.menu.height * 64
 
-        self.player1 = Player((32, 32), self.all_sprites, self.width, self.height,
-                              '..\\CPSC60500-Project\\graphics\\player1\\')
-        self.player1.turn = 0
-        if self.menu.level_selected >= 2:
-            self.player1.selected = True
+        # a replay's players start where they started in the recording, so they never need placing
+        # players alternate between a vertical and a horizontal first move
+        starts = self.start_positions()
+        turns = [index % 2 for index in range(len(starts))]
+        if self.replay is not None:
+            starts, turns = self.replay.starts, self.replay.turns
+
+        self.players = []
+        self.states = PlayerStates()
+        for index, (start, turn) in enumerate(zip(starts, turns)):
+            player = Player(self.states, start, turn, self.all_sprites, self.width, self.height,
+                            'player{}'.format(index % 4 + 1))
+            player.color = PLAYER_COLORS[index % 4]
+            player.placed = self.menu.level_selected == 1 or self.replay is not None
+            self.players.append(player)
+
+        if self.menu.level_selected >= 2 and self.replay is None:
+            self.players[0].selected = True
         else:
-            self.player1.placed = True
-
-        self.player2 = Player((self.width - 32, self.height - 32), self.all_sprites, self.width, self.height,
-                              '..\\CPSC60500-Project\\graphics\\player2\\')
-        self.player2.turn = 1
-        if self.menu.level_selected == 1:
-            self.player2.placed = True
             self.players_placed = True
 
-        if self.menu.playerNum == 2:
-            self.players = [self.player1, self.player2]
-        if self.menu.playerNum >= 3:
-            self.player3 = Player((self.width - 32, 32), self.all_sprites, self.width, self.height,
-                                  '..\\CPSC60500-Project\\graphics\\player3\\')
-            self.player3.turn = 0
-            self.players = [self.player1, self.player2, self.player3]
-        if self.menu.playerNum == 4:
-            self.player4 = Player((32, self.height - 32), self.all_sprites, self.width, self.height,
-                                  '..\\CPSC60500-Project\\graphics\\player4\\')
-            self.player4.turn = 1
-            self.players = [self.player1, self.player2, self.player3, self.player4]
-
-        self.overlay = Overlay(self.players, self.menu.playerNum, self.menu.protocols[self.menu.pro_index])
+        self.seed = next_game_seed() if self.replay is None else self.replay.seed
+        self.overlay = Overlay(self.players, self.menu.playerNum, self.menu.protocols[self.menu.pro_index], self.seed,
+                               self.speed)
+        self.camera.resize(self.width, self.height)
+
+        # a replay's timeline goes right under the grid, or along the bottom of the play area when the grid fills it
+        if self.replay is not None:
+            top = min(self.camera.to_screen((0, self.height))[1] + 12, PLAY_SIZE - 20)
+            self.timeline = Slider((255, 255, 255), (90, 90, 90), (16, top, PLAY_SIZE - 32, 10))
+        self.background = None  # draw the grid, and the new overlay over it, from scratch on the next frame
         self.players_created = True
 
-    # repeatedly draws the grid depending on the current width and height settings
-    # also creates lines around the overlay
-    def render_grid(self):
-        white = (255, 255, 255)
-        for x in range(0, self.height + 1, 64):
-            pygame.draw.line(self.display_surface, white, (1, x), (self.width+1, x), 2)
-        for x in range(0, self.width + 1, 64):
-            pygame.draw.line(self.display_surface, white, (x, 1), (x, self.height+1), 2)
-        pygame.draw.line(self.display_surface, white, (SCREEN_WIDTH-2, 1), (SCREEN_WIDTH-2, SCREEN_WIDTH-2), 2)
-        pygame.draw.line(self.display_surface, white, (768, 1), (768, 768), 2)
-        pygame.draw.line(self.display_surface, white, (768, 0), (960, 0), 2)
-        pygame.draw.line(self.display_surface, white, (768, 768), (960, 768), 2)
-
-    # uses player collisions to determine when players are found and which players will lead the others
-    # once all the players are found, the menu is updated to show the game over screen, and the overlay is updated
-    # to stop the timer. the level detects when the main menu or reset buttons are pressed, so it can either reset or
-    # reinitialize the level along with the menu, player, and overlay settings
+    # only run once all the players are placed to create the simulation from where the players were placed
+    def create_simulation(self):
+        starts = list(zip(self.states.start_x, self.states.start_y))
+        turns = list(self.states.start_turn)
+        protocol = self.menu.protocols[self.menu.pro_index]
+        directions = self.replay.directions if self.replay is not None else None
+        self.simulation = Simulation(self.width // 64, self.height // 64, protocol, starts, turns, seed=self.seed,
+                                     directions=directions)
+        self.clock = 0
+        self.real_time = self.played_time = self.dropped_time = 0
+        self.scheduler.clear()
+        self.schedule_step()
+        self.states.reset()  # every slide starts from the cell the player was placed in
+        self.solve_expected_time()
+
+        self.recording = None
+        if RECORD_REPLAYS and self.replay is None:
+            self.recording = replay.Recording(self.seed, self.width // 64, self.height // 64, protocol,
+                                              self.menu.level_selected, starts, turns)
+
+        if self.replay_to_end:  # skip to the end of the replay: every step is taken now, and the players are put
+                                # straight into the cells they ended up in
+            self.simulation.run()
+            self.clock = self.simulation.time()
+            self.scheduler.clear()
+            self.states.sync(self.simulation)
+            self.states.arrive()
+            self.replay_to_end = False
+
+    # play a recorded game back instead of going through the menu: the level is set up the way the recording was, the
+    # players start where they did, and the simulation makes the recorded moves, `speed` times faster than normal. with
+    # to_end the replay skips straight to how the game ended
+    def play_replay(self, recording, speed=1, to_end=False):
+        self.replay = recording
+        self.replay_to_end = to_end
+        self.set_speed(speed)
+
+        self.menu.level_selected = recording.level
+        self.menu.playerNum = len(recording.starts)
+        self.menu.width = recording.width
+        self.menu.height = recording.height
+        self.menu.pro_index = self.menu.protocols.index(recording.protocol)
+        self.menu.screen = None
+        self.menu.started = True
+
+    # move the replay to a step straight away, from the keyframe before it, with the players put straight into their
+    # cells. moving back from the end of the game takes the game over screen away again
+    def seek(self, step):
+        try:
+            replay.seek(self.simulation, self.replay, step)
+        except ValueError as error:  # the moves are still fine, so the replay goes on by playing them from the start
+            print('the replay could not use its keyframes: {}'.format(error))
+            self.replay.keyframes = []
+            replay.seek(self.simulation, self.replay, step)
+        self.clock = self.simulation.time()
+        self.scheduler.clear()
+        self.schedule_step()
+        self.states.sync(self.simulation)
+        self.states.arrive()
+
+        if self.all_found and not self.simulation.over:
+            self.all_found = False
+            self.menu.over = False
+            self.overlay.game_over = False
+
+    # dragging the timeline moves the replay to the step under the mouse. a drag sends many events a frame, so the
+    # replay only seeks once, to where the last one left the timeline
+    def scrub(self, event_list):
+        values = [self.timeline.press(event) for event in event_list]
+        values = [value for value in values if value is not None]
+        if values and self.simulation is not None:
+            self.seek(round(values[-1] * self.replay.steps))
+
+    # draws the timeline with its knob at the step the replay is on, over whatever was drawn under it
+    # returns the part of the screen that changed
+    def render_timeline(self):
+        if self.simulation is not None:
+            self.timeline.set(self.simulation.steps / max(1, self.replay.steps))
+        self.timeline.draw(self.display_surface)
+        return self.timeline.rect
+
+    # play the game `speed` times faster than normal, between the slowest and fastest of SPEEDS
+    def set_speed(self, speed):
+        self.speed = min(max(speed, SPEEDS[0]), SPEEDS[-1])
+        self.real_time = self.played_time = self.dropped_time = 0
+        if self.players_created:
+            self.overlay.set_speed(self.speed)
+
+    # the overlay's arrows step through SPEEDS from the speed the game is at
+    def change_speed(self, event_list):
+        for event in event_list:
+            pressed = self.overlay.press(event)
+            if pressed == 'slower':
+                self.set_speed(max([speed for speed in SPEEDS if speed < self.speed], default=SPEEDS[0]))
+            elif pressed == 'faster':
+                self.set_speed(min([speed for speed in SPEEDS if speed > self.speed], default=SPEEDS[-1]))
+
+    # the simulated time of the game. while the simulation is behind, it goes no further than the next step, so the
+    # timer keeps with the players. once the game is over, it ends when the players finish sliding into their last
+    # cells
+    def game_time(self):
+        if self.simulation is None:
+            return 0
+        if self.simulation.over:
+            return min(self.clock, self.simulation.time() + (TILE_SIZE / SLIDE_SPEED if self.speed < DISCRETE_SPEED
+                                                             else 0))
+        return min(self.clock, self.simulation.time() + STEP_TIME)
+
+    # schedule the simulation's next step, STEP_TIME after its last one, unless the game is over
+    def schedule_step(self):
+        if not self.simulation.over:
+            self.scheduler.add(self.simulation.time() + STEP_TIME, STEP)
+
+    # the simulation runs on a fixed timestep, driven by the scheduler: the game time of every frame is added to the
+    # clock, and only the events that came due by then are handled, in the order they were due. a step event steps the
+    # simulation and schedules the next one STEP_TIME later, so a long frame (or a sped up game) takes several steps at
+    # once and a short one none, and the game plays out the same at any frame rate. after the steps, the player states
+    # are brought up to date from the simulation in one go, and the end of every slide that started is scheduled too;
+    # sped up past DISCRETE_SPEED, a slide would be over before the next frame, so players jump straight into their
+    # cells instead. the steps of a frame only get STEP_BUDGET seconds, so the game keeps responding however fast it is
+    # going: the steps the simulation can't get to stay due and are taken on the frames after. only once it is more
+    # than STEP_BACKLOG seconds behind is the game time past that dropped
+    def step_simulation(self, dt):
+        if self.simulation is None:
+            return
+
+        self.clock += dt * self.speed
+        dropped = 0
+        if not self.simulation.over:
+            dropped = max(0, self.clock - self.simulation.time() - STEP_TIME - STEP_BACKLOG * self.speed)
+            self.clock -= dropped
+        self.measure_speed(dt, dropped)
+
+        deadline = time.perf_counter() + STEP_BUDGET
+        stepped = False
+        for due, kind, index in self.scheduler.due(self.clock):
+            if kind == ARRIVE:
+                self.states.arrive_player(index)
+            elif stepped and time.perf_counter() > deadline:
+                self.scheduler.add(due, STEP)  # still due, so it is the first thing taken on the next frame
+                break
+            else:
+                self.simulation.step()
+                if self.recording is not None:
+                    self.recording.record(self.simulation)
+                self.schedule_step()
+                stepped = True
+
+        if stepped:
+            self.states.sync(self.simulation)
+            if self.speed >= DISCRETE_SPEED:
+                self.states.arrive()
+            else:
+                arrival = self.simulation.time() + TILE_SIZE / SLIDE_SPEED
+                for index in range(self.states.count):
+                    if self.states.sliding[index]:
+                        self.scheduler.add(arrival, ARRIVE, index)
+
+    # add a frame to the game time measured over SPEED_WINDOW, and once the window is over, show the speed the game
+    # really went at in the speed control if any game time was dropped in it, or the speed it was set to if not
+    def measure_speed(self, dt, dropped):
+        self.real_time += dt
+        self.played_time += dt * self.speed - dropped
+        self.dropped_time += dropped
+        if self.real_time >= SPEED_WINDOW:
+            self.overlay.set_speed(self.speed, self.played_time / self.real_time if self.dropped_time else None)
+            self.real_time = self.played_time = self.dropped_time = 0
+
+    # how far along their slides the players are drawn, from 0 to 1, by how much game time has passed since the last
+    # step, or None before the simulation starts. sped up past DISCRETE_SPEED, a slide would be over before the next
+    # frame, so players jump straight into their cells
+    def slide_progress(self):
+        if self.simulation is None:
+            return None
+        return 1 if self.speed >= DISCRETE_SPEED else (self.clock - self.simulation.time()) * SLIDE_SPEED / TILE_SIZE
+
+    # update every player at once: the one being placed follows the arrow keys, and then every player's animation and
+    # slide is moved on in one pass over the player states
+    def update_players(self, dt):
+        for player in self.players:
+            if player.selected and not (player.placed and player.all_placed):
+                player.input(dt)
+        self.states.update(dt, self.slide_progress())
+
+    # how many seconds until the level changes on its own (a player animating or sliding, the timer ticking, or the next
+    # simulation step), so the game can sleep until then while nothing is moving, or None if nothing changes until the
+    # user does something
+    def next_change(self):
+        if not self.menu.started:
+            return None  # the menu screens only change when they are clicked
+        if not self.players_created or self.reset or any(pygame.key.get_pressed()):
+            return 0  # a held key keeps moving the player being placed, or scrolling the camera
+        if self.players_placed and (self.simulation is None or
+                                    self.simulation.over and not self.all_found and not self.scheduler):
+            return 0  # the simulation is about to start, or the game is about to end
+        if self.all_found and self.menu.expected_time is None and self.solving():
+            return 0.1  # check back for the expected time to show on the game over screen
+
+        # the timer and the scheduled events run on game time, which goes by faster in a sped up game
+        game_changes = [self.overlay.next_change()]
+        if self.simulation is not None and self.scheduler:
+            game_changes.append(max(0, self.scheduler.next_time() - self.clock))
+        changes = [self.states.next_change()]
+        changes += [change / self.speed for change in game_changes if change is not None]
+        changes = [change for change in changes if change is not None]
+        return min(changes) + .001 if changes else None  # a moment late, so whatever is due has definitely happened
+
+    # save the game that just ended as a replay. the game goes on without it if it can't be saved
+    def save_recording(self):
+        if self.recording is None:
+            return
+        try:
+            replay.save(self.recording)
+        except OSError as error:
+            print('the replay could not be saved: {}'.format(error))
+        self.recording = None
+
+    # the settings the exact expected time is worked out from, or None when it can't be solved for (more than two
+    # players, or a large grid)
+    def expected_settings(self):
+        if len(self.simulation.walkers) != 2:
+            return None
+        if self.simulation.width > MAX_GRID_SIZE or self.simulation.height > MAX_GRID_SIZE:
+            return None
+        starts = tuple((walker.start_x, walker.start_y) for walker in self.simulation.walkers)
+        turns = tuple(walker.start_turn for walker in self.simulation.walkers)
+        return self.simulation.width, self.simulation.height, self.simulation.protocol, starts, turns
+
+    # start working out the exact expected time of the game that just started on a background thread. loading numpy
+    # and scipy and solving takes a second or more, which would otherwise hold up the frame the game ends on
+    def solve_expected_time(self):
+        settings = self.expected_settings()
+        if settings is None:
+            return
+
+        def solve():
+            try:
+                import markov
+            except ImportError:  # the game still runs without numpy and scipy
+                return
+            self.expected = (settings, markov.expected_time(*settings))
+
+        self.solver = threading.Thread(target=solve, daemon=True)
+        self.solver.start()
+
+    # the exact expected time for the game being played, or None when it can't be solved for (see expected_settings),
+    # numpy and scipy aren't installed, or it is still being worked out
+    def expected_time(self):
+        if self.expected is None or self.expected[0] != self.expected_settings():
+            return None
+        return self.expected[1]
+
+    # True while the expected time of the game being played is still being worked out
+    def solving(self):
+        return self.solver is not None and self.solver.is_alive()
+
+    # draws the part of the grid in the camera's view depending on the current width and height settings, and the lines
+    # around the overlay, onto a background surface. this only happens when the grid changes size or the camera moves,
+    # otherwise the background from last time is used. the background is blitted in one go when the whole screen is
+    # being drawn, which is always the case when the background had to be drawn again
+    # returns True when the whole screen is being drawn
+    def render_grid(self, full):
+        view = self.camera.view()
+        if self.background is None or view != self.background_view:
+            full = True
+            self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            self.background_view = view
+
+            white = (255, 255, 255)
+            self.background.fill('black')
+            self.background.set_clip(self.camera.viewport)
+            self.camera.draw_grid(self.background)
+            self.background.set_clip(None)
+            pygame.draw.line(self.background, white, (SCREEN_WIDTH-2, 1), (SCREEN_WIDTH-2, SCREEN_WIDTH-2), 2)
+            pygame.draw.line(self.background, white, (768, 1), (768, 768), 2)
+            pygame.draw.line(self.background, white, (768, 0), (960, 0), 2)
+            pygame.draw.line(self.background, white, (768, 768), (960, 768), 2)
+
+        if full:
+            self.display_surface.blit(self.background, (0, 0))
+        return full
+
+    # draws the players in the camera's view. only the players that moved or changed animation frame are cleared and
+    # drawn again, unless the whole screen is being drawn
+    # returns the parts of the screen that changed
+    def render_players(self, full):
+        self.camera.place_players(self.players, self.states)
+        if full:
+            for player in self.players:
+                player.dirty = 1
+        with profiler.phase('sprites.draw'):
+            return self.all_sprites.draw(self.display_surface, self.background)
+
+    # the simulation determines when players are found and which players will lead the others
+    # once all the players are found and have finished moving, the menu is updated to show the game over screen, and the
+    # overlay is updated to stop the timer. the level detects when the main menu or reset buttons are pressed, so it can
+    # either reset or reinitialize the level along with the menu, player, and overlay settings
     def input(self, event_list):
-        if self.menu.level_selected == 1:
-            if self.player1.rect.collidepoint(self.player2.pos):
-                self.player1.found = True
-                self.player2.found = True
+        if self.simulation is not None and self.simulation.over:
+            if not self.scheduler:  # the last slide is over, right when it was scheduled to be
                 self.all_found = True
 
-        if self.menu.level_selected == 2 or self.menu.level_selected == 3:
-            if self.menu.playerNum == 2:
-                if self.player1.rect.collidepoint(self.player2.pos):
-                    self.player1.found = True
-                    self.player2.found = True
-                    self.all_found = True
-
-            if self.menu.playerNum >= 3:
-                if self.player1.rect.collidepoint(self.player2.pos) or self.p12:
-                    self.p12 = True
-                    self.player1.found = True
-                    self.player2.found = True
-                    self.player2.follow(self.player1)
-                    self.player1.lead = True
-                if self.player1.rect.collidepoint(self.player3.pos) or self.p13:
-                    self.p13 = True
-                    self.player1.found = True
-                    self.player3.found = True
-                    self.player3.follow(self.player1)
-                    self.player1.lead = True
-                if self.player2.rect.collidepoint(self.player3.pos) or self.p23:
-                    self.p23 = True
-                    self.player2.found = True
-                    self.player3.found = True
-                    self.player3.follow(self.player2)
-                    self.player2.lead = True
-                if self.menu.playerNum != 4 and self.player1.found and self.player2.found and self.player3.found:
-                    self.all_found = True
-                    self.player1.lead = False
-                    self.player2.lead = False
-                    self.p12 = False
-                    self.p13 = False
-                    self.p23 = False
-
-            if self.menu.playerNum == 4:
-                if self.player1.rect.collidepoint(self.player4.pos) or self.p14:
-                    self.p14 = True
-                    self.player1.found = True
-                    self.player4.found = True
-                    self.player4.follow(self.player1)
-                    self.player1.lead = True
-                if self.player2.rect.collidepoint(self.player4.pos) or self.p24:
-                    self.p24 = True
-                    self.player2.found = True
-                    self.player4.found = True
-                    self.player4.follow(self.player2)
-                    self.player2.lead = True
-                if self.player3.rect.collidepoint(self.player4.pos) or self.p34:
-                    self.p34 = True
-                    self.player3.found = True
-                    self.player4.found = True
-                    self.player4.follow(self.player3)
-                    self.player3.lead = True
-                if self.player1.found and self.player2.found and self.player3.found and self.player4.found\
-                        and self.player1.pos == self.player2.pos == self.player3.pos == self.player4.pos:
-                    self.all_found = True
-                    self.player1.lead = False
-                    self.player2.lead = False
-                    self.player3.lead = False
-                    self.p12 = False
-                    self.p13 = False
-                    self.p23 = False
-                    self.p14 = False
-                    self.p24 = False
-                    self.p34 = False
-
         if self.all_found:
             if not self.found_updated:
                 self.times_reset = self.times_reset + 1
@@ -231,122 +470,125 @@ class Level:
                 self.menu.wander = self.wander
                 self.menu.best_width = self.best_width
                 self.menu.best_height = self.best_height
+                self.menu.expected_time = self.expected_time()
+                self.save_recording()
                 self.found_updated = True
 
+            if self.menu.expected_time is None:  # shown as soon as it has been worked out
+                self.menu.expected_time = self.expected_time()
             self.menu.game_over()
             self.overlay.game_over = True
             for event in event_list:
-                if event.type == pygame.MOUSEBUTTONUP:
-                    if self.menu.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.reset = True
-                        self.menu.over = False
-                        self.overlay.game_over = False
-                        self.instructions_read = False
-                        self.all_found = False
-                        self.found_updated = False
-                        self.display_surface.fill('black')
-                        if self.menu.level_selected == 3:
-                            self.menu.started = False
-                            self.menu.screen2 = True
-                    if self.menu.button2Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.display_surface.fill('black')
-                        self.__init__(True)
+                pressed = self.menu.get_screen('over').press(event)
+                if pressed == 'reset':
+                    self.reset = True
+                    self.menu.over = False
+                    self.overlay.game_over = False
+                    self.instructions_read = False
+                    self.all_found = False
+                    self.found_updated = False
+                    self.display_surface.fill('black')
+                    if self.menu.level_selected == 3:  # 6-8 goes back to picking the grid size
+                        self.menu.started = False
+                        self.menu.screen = 'size'
+                if pressed == 'main menu':
+                    self.display_surface.fill('black')
+                    self.__init__(True)
+                    break
 
         if self.menu.started and not self.players_placed and self.menu.level_selected >= 2:
             if not self.instructions_read:
                 self.menu.instructions()
             for event in event_list:
-                if event.type == pygame.MOUSEBUTTONUP:
-                    if self.menu.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.menu.instruction = False
-                        self.instructions_read = True
+                if self.menu.get_screen('instructions').press(event) == 'confirm':
+                    self.menu.instruction = False
+                    self.instructions_read = True
 
     # continuously run the level to update various level, menu, player, and overlay settings
+    # returns the parts of the screen that changed this frame, or None when the whole screen has to be updated
+    # everything is drawn again when dirty rects are turned off, while a menu screen is drawn over the level, and for
+    # the frame after one of those, since the menu may have changed the screen in ways the level doesn't track
     def run(self, dt, event_list):
-        self.display_surface.fill('black')
+        covered = self.menu.showing()
+        full = not DIRTY_RECTS or self.redraw or covered
+        changed = []
+
+        if not self.menu.started:  # once the game is started the grid's background covers the whole screen
+            self.display_surface.fill('black')
 
         if self.menu.started:  # do this once the player hits the confirm button after the instructions
             if self.reset:  # run this only once to update player and overlay settings
-                self.players_placed = False
+                self.players_placed = self.menu.level_selected == 1  # K-2 players never need to be placed again
+                self.simulation = None
+                if self.replay is not None:  # after a replay, the next game is played as normal
+                    self.replay = None
+                    self.timeline = None
+                    self.set_speed(1)
+                self.seed = next_game_seed()  # every game gets its own random numbers
                 self.update()
-                self.player1.reset()
-                self.player2.reset()
-                if self.menu.playerNum >= 3:
-                    self.player3.reset()
-                if self.menu.playerNum == 4:
-                    self.player4.reset()
-
-                if self.menu.level_selected >= 2:
-                    self.player1.placed = False
-                    self.player1.all_placed = False
-                    self.player1.selected = True
-                    self.player2.placed = False
-                    self.player2.all_placed = False
-                    self.player2.selected = False
-                    if self.menu.playerNum >= 3:
-                        self.player3.placed = False
-                        self.player3.all_placed = False
-                        self.player3.selected = False
-                    if self.menu.playerNum == 4:
-                        self.player4.placed = False
-                        self.player4.all_placed = False
-                        self.player4.selected = False
+                self.states.reset()
+                for player in self.players:
+                    if self.menu.level_selected >= 2:
+                        player.placed = False
+                        player.all_placed = False
+                        player.selected = False
 
                 self.overlay.reset()
-                self.player1.selected = True
+                self.players[0].selected = True
 
                 self.reset = False
 
-            self.render_grid()  # should always render the grid once the game is started
-            self.all_sprites.draw(self.display_surface)  # always draw the sprites once game is starting
-            self.all_sprites.update(dt)  # continuously update the sprites
+            self.camera.input(event_list, dt)  # scroll and zoom around large grids
+            if self.timeline is not None:
+                self.scrub(event_list)  # move through the replay
+            with profiler.phase('render_grid'):
+                full = self.render_grid(full)  # should always render the grid once the game is started
+            changed += self.render_players(full)  # always draw the sprites once game is starting
+            if self.timeline is not None:
+                changed.append(self.render_timeline())
+            with profiler.phase('level.update'):
+                self.step_simulation(dt)  # move the players through the woods
+            with profiler.phase('sprites.update'):
+                self.update_players(dt)  # continuously update the players
 
             if self.players_created:  # update the level and overlay settings once the players are created
-                self.update()
-                self.overlay.display(dt)
+                with profiler.phase('level.update'):
+                    self.update()
+                    self.change_speed(event_list)
+                with profiler.phase('overlay.display'):
+                    changed += self.overlay.display(self.game_time(), None if full else self.background)
             else:  # create the players if they have not already been created
                 self.create_players()
 
-            self.input(event_list)  # detect collisions and button clicks once the game is started
+            with profiler.phase('level.input'):
+                self.input(event_list)  # detect collisions and button clicks once the game is started
 
             if self.menu.level_selected >= 2:  # player placement will only be checked for 3-5 and 6-8 levels
-                # once a player, the next once is selected until all players are placed
-                if self.player1.placed:
-                    self.player1.selected = False
-                    self.player2.selected = True
-                if self.menu.playerNum == 2:
-                    if self.player2.placed:
-                        self.player2.selected = False
-                        self.players_placed = True
-                if self.menu.playerNum == 3:
-                    if self.player2.placed:
-                        self.player2.selected = False
-                        self.player3.selected = True
-                    if self.player3.placed:
-                        self.player3.selected = False
-                        self.players_placed = True
-                if self.menu.playerNum == 4:
-                    if self.player2.placed:
-                        self.player2.selected = False
-                        self.player3.selected = True
-                    if self.player3.placed:
-                        self.player3.selected = False
-                        self.player4.selected = True
-                    if self.player4.placed:
-                        self.player4.selected = False
-                        self.players_placed = True
+                # once a player is placed, the next one is selected until all players are placed. the camera keeps
+                # whoever is being placed in view
+                for index, player in enumerate(self.players):
+                    if player.selected:
+                        self.camera.follow(player.pos)
+                    if player.placed:
+                        player.selected = False
+                        if index + 1 < len(self.players):
+                            self.players[index + 1].selected = True
+                        else:
+                            self.players_placed = True
 
             # once all the players are placed, update the players, so they can start moving
             if self.players_placed:
-                self.player1.all_placed = True
-                self.player2.all_placed = True
-                if self.menu.playerNum >= 3:
-                    self.player3.all_placed = True
-                if self.menu.playerNum == 4:
-                    self.player4.all_placed = True
+                if self.simulation is None:
+                    self.create_simulation()
+                for player in self.players:
+                    player.all_placed = True
 
         # after the level is reinitialized, all the above code is run first before updating the menu
         if not self.reinit:
-            self.menu.update(event_list)
+            with profiler.phase('menu.update'):
+                self.menu.update(event_list)
 
         self.reinit = False
+
+        self.redraw = covered or self.menu.showing()
+        return None if full or self.redraw else changed
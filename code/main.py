@@ -15,41 +15,141 @@
 # file: main.py
 # purpose: set up and start the game
 
+import time
+STARTED = time.perf_counter()  # when the game started loading, for the startup report
+
+import argparse
 import pygame
 import sys
 import os
 from settings import *
 from level import Level
+from pacing import FramePacer
+from support import asset_path
+from profiler import profiler, ProfilerHUD, HUD_REFRESH
+import replay
 
 
 class Game:
     def __init__(self):
+        self.startup = [('imports', time.perf_counter())]  # each part of starting the game and when it finished
+
         pygame.init()
-        pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))  # set screen size with width and height
-                                                                              # define in settings.py
+        try:  # set screen size with width and height define in settings.py
+            pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SCALED if VSYNC else 0, vsync=int(VSYNC))
+        except pygame.error:  # vsync isn't available on every system
+            pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption('Wandering in the Woods')  # set the display caption at top of screen
-        self.clock = pygame.time.Clock()  # create a clock for the game
-        self.level = Level(False)  # create the level, setting reinit to false since this is the first time initializing
+        self.pacer = FramePacer()  # decides when frames are drawn, and keeps the clock for the game
+        self.hud = ProfilerHUD(profiler)  # shows how long each part of a frame takes, when it's turned on
+        self.startup.append(('display', time.perf_counter()))
+
+        # create the level, setting reinit to false since this is the first time initializing. only the menu's title
+        # screen is built now; the rest of the menu, the players, and the overlay are built once a level is picked
+        self.level = Level(False)
+        self.startup.append(('level', time.perf_counter()))
+
+        # background music, streamed from the file as it plays instead of decoded into memory before the game starts
+        try:
+            pygame.mixer.music.load(asset_path('sound', 'music.mp3'))
+            pygame.mixer.music.set_volume(.5)
+            pygame.mixer.music.play(loops=-1)
+        except pygame.error:  # there's no sound device, so the game goes on without music
+            pass
+        self.startup.append(('music', time.perf_counter()))
+
+    # print how long each part of starting the game took, up to the first frame being shown
+    def startup_report(self):
+        total = self.startup[-1][1] - STARTED
+        print('startup: {:.0f} ms to the first frame ({} the {:.0f} ms budget)'.format(
+            total * 1000, 'over' if total > STARTUP_BUDGET else 'within', STARTUP_BUDGET * 1000))
+        finished = STARTED
+        for part, time_finished in self.startup:
+            print('  {:<12}{:8.1f} ms'.format(part, (time_finished - finished) * 1000))
+            finished = time_finished
+
+    # the profiler's keys: one shows or hides the hud, the other saves what the profiler has timed as a trace
+    def profile_input(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.key.key_code(PROFILE_HUD_KEY):
+            self.hud.toggle()
+            self.level.redraw = True  # the hud has to be drawn over the first time, or cleared away
+        elif event.key == pygame.key.key_code(PROFILE_TRACE_KEY):
+            try:
+                print('profile saved to {}'.format(profiler.dump()))
+            except OSError as error:
+                print('the profile could not be saved: {}'.format(error))
 
-        # background music
-        self.music = pygame.mixer.Sound('..\\CPSC60500-Project\\sound\\music.mp3')
-        self.music.set_volume(.5)
-        self.music.play(loops=-1)
+    # one frame of the game: handle the events that came in, run the level, and send what changed to the display.
+    # the game sleeps up to `wait` seconds first if nothing happens, and the frame takes `dt` seconds of game time
+    # instead of the time since the last frame when it's given (the benchmark plays every game at a fixed step)
+    # returns how long to wait before the next frame if nothing happens
+    def frame(self, wait, dt=None):
+        profiler.frame()
+        with profiler.phase('events'):
+            event_list = self.pacer.events(wait)  # gets list of events that will be used throughout the program
+        # if the user clicks the red X the game is closed
+        for event in event_list:
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.WINDOWEXPOSED:  # the window's contents were lost, so draw all of it again
+                self.level.redraw = True
+            self.profile_input(event)
+        if self.pacer.resumed:
+            self.level.redraw = True
+
+        elapsed = self.pacer.tick()  # delta time in seconds, which is 0 for the frame after the game was paused
+        dt = elapsed if dt is None else dt
+        changed = self.level.run(dt, event_list)  # run the level
+        if self.hud.visible:  # drawn over everything else
+            hud = self.hud.draw(pygame.display.get_surface(), dt)
+            if changed is not None:
+                changed.append(hud)
+        with profiler.phase('display.update'):
+            # continuously update the parts of the display that changed, or all of it when changed is None
+            # (display.update(None) would update nothing)
+            if changed is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(changed)
+
+        if self.startup is not None:  # the first frame is on the screen
+            self.startup.append(('first frame', time.perf_counter()))
+            if STARTUP_REPORT or self.startup[-1][1] - STARTED > STARTUP_BUDGET:
+                self.startup_report()
+            self.startup = None
+
+        # input can change the screen on the frame after it too (like clicking through to the next menu screen),
+        # so the game only sleeps once a frame goes by without any
+        wait = 0 if event_list else self.level.next_change()
+        if self.hud.visible:  # keep the numbers on the hud moving while nothing else is
+            wait = HUD_REFRESH if wait is None else min(wait, HUD_REFRESH)
+        return wait
 
     def run(self):
+        wait = 0  # how long to sleep before the next frame if nothing happens; the first frame is drawn straight away
         while True:
-            event_list = pygame.event.get()  # gets list of events that will be used throughout the program
-            # if the user clicks the red X the game is closed
-            for event in event_list:
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+            wait = self.frame(wait)
 
-            dt = self.clock.tick() / 1000  # delta time = tick/1000 = about 1 ms
-            self.level.run(dt, event_list)  # run the level
-            pygame.display.update()  # continuously update the display
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Wandering in the Woods')
+    parser.add_argument('--replay', metavar='FILE', help='watch a game saved in the replays folder again')
+    parser.add_argument('--speed', type=float, default=1,
+                        help='how many times faster than normal to play the replay, from {:g} to {:g}'.format(
+                            SPEEDS[0], SPEEDS[-1]))
+    parser.add_argument('--end', action='store_true', help="skip straight to how the replay's game ended")
+    args = parser.parse_args()
 
+    recording = None
+    if args.replay is not None:
+        try:
+            recording = replay.load(args.replay)
+        except (OSError, ValueError) as error:
+            parser.error('could not load the replay: {}'.format(error))
 
-if __name__ == '__main__':
     game = Game()  # create the game
+    if recording is not None:
+        game.level.play_replay(recording, args.speed, args.end)
     game.run()  # run the game
@@ -0,0 +1,197 @@
+# file: markov.py
+# purpose: exact expected meeting time and meeting time distribution for two players, solved from the markov chain the
+#          wandering protocols define on pairs of grid cells. states that are reflections or rotations of each other
+#          (or the same state with the two players swapped) always take the same time, so they are merged into one
+
+import functools
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from batch import move_table
+from simulation import STEP_TIME, default_starts
+
+DISTRIBUTION_CUTOFF = 1000  # default number of steps the meeting time distribution is computed for
+
+
+# the solved chain for one grid size, protocol, and pair of 'every other' turns
+class Chain:
+    def __init__(self, width, height, protocol, delta):
+        self.width = width
+        self.height = height
+        self.protocol = protocol
+        self.delta = delta  # 1 when the players' 'every other' turns are opposite, 0 when they match
+        self.cells = width * height
+        self.phases = 2 if protocol == 'every other' else 1  # the turn of the first player is part of the state
+
+        self.orbit = self.find_orbits()  # the merged state (orbit) every state belongs to
+        self.build_matrix()
+        self.solve()
+
+    # a state packs the first player's turn and both players' cells into one number
+    def encode(self, turn, first, second):
+        return (turn * self.cells + first) * self.cells + second
+
+    def decode(self, state):
+        return state // (self.cells * self.cells), (state // self.cells) % self.cells, state % self.cells
+
+    # the reflections and rotations of the grid as cell maps, with whether they swap the vertical and horizontal axes
+    def symmetries(self):
+        x = np.arange(self.cells) % self.width
+        y = np.arange(self.cells) // self.width
+        w = self.width - 1
+        h = self.height - 1
+
+        maps = [(y * self.width + x, 0), (y * self.width + w - x, 0), ((h - y) * self.width + x, 0),
+                ((h - y) * self.width + w - x, 0)]
+        if self.width == self.height:  # a square grid can also be rotated a quarter turn or reflected diagonally
+            maps += [(x * self.width + y, 1), (x * self.width + h - y, 1), ((w - x) * self.width + y, 1),
+                     ((w - x) * self.width + h - y, 1)]
+        return maps
+
+    # label every state with the smallest state it can be turned into by a symmetry, then number those labels
+    def find_orbits(self):
+        states = np.arange(self.phases * self.cells * self.cells)
+        turn, first, second = self.decode(states)
+
+        canonical = states.copy()
+        for cell_map, axes_swapped in self.symmetries():
+            # swapping the axes turns a vertical 'every other' step into a horizontal one, so the turn flips too
+            image_turn = turn ^ axes_swapped if self.phases == 2 else turn
+            canonical = np.minimum(canonical, self.encode(image_turn, cell_map[first], cell_map[second]))
+            # the same state with the players swapped, where the first player's turn is now the second player's
+            swapped_turn = image_turn ^ self.delta if self.phases == 2 else image_turn
+            canonical = np.minimum(canonical, self.encode(swapped_turn, cell_map[second], cell_map[first]))
+
+        self.representatives, orbit = np.unique(canonical, return_inverse=True)
+        return orbit
+
+    # build the transition matrix between orbits from one representative of each orbit
+    # orbits where the players share a cell are absorbing and are left out; r holds the chance of meeting in one step
+    def build_matrix(self):
+        table, draws = move_table(self.width, self.height, self.protocol)
+        turn, first, second = self.decode(self.representatives)
+
+        self.meeting = first == second  # orbits where the players have already met
+        self.transient = np.flatnonzero(~self.meeting)
+        index = np.full(len(self.representatives), -1)
+        index[self.transient] = np.arange(len(self.transient))  # position of each transient orbit in the matrix
+
+        rows = []
+        columns = []
+        self.r = np.zeros(len(self.transient))
+        turn, first, second = turn[self.transient], first[self.transient], second[self.transient]
+        second_turn = turn ^ self.delta if self.phases == 2 else turn
+        next_turn = turn ^ 1 if self.phases == 2 else turn
+
+        for first_draw in range(draws):
+            for second_draw in range(draws):
+                new_first = table[(turn * self.cells + first) * draws + first_draw]
+                new_second = table[(second_turn * self.cells + second) * draws + second_draw]
+                met = (new_first == new_second) | ((new_first == second) & (new_second == first))
+
+                self.r += met / (draws * draws)
+                target = index[self.orbit[self.encode(next_turn, new_first, new_second)]]
+                rows.append(np.flatnonzero(~met))
+                columns.append(target[~met])
+
+        rows = np.concatenate(rows)
+        columns = np.concatenate(columns)
+        probabilities = np.full(len(rows), 1 / (draws * draws))
+        size = len(self.transient)
+        self.q = scipy.sparse.csr_matrix((probabilities, (rows, columns)), shape=(size, size))  # duplicates are summed
+
+    # expected steps until meeting from every orbit: solve (I - Q) h = 1 over the orbits that are sure to meet.
+    # orbits that can reach a part of the chain where the players never meet take forever on average
+    def solve(self):
+        reach = (self.q > 0).astype(np.int8).tocsr()
+
+        # orbits that can eventually meet
+        can_meet = self.r > 0
+        while True:
+            grown = can_meet | (reach @ can_meet.astype(np.int8) > 0)
+            if (grown == can_meet).all():
+                break
+            can_meet = grown
+
+        # orbits that can wander into an orbit that never meets
+        doomed = ~can_meet
+        while True:
+            grown = doomed | (reach @ doomed.astype(np.int8) > 0)
+            if (grown == doomed).all():
+                break
+            doomed = grown
+
+        finite = np.flatnonzero(~doomed)
+        steps = np.full(len(self.transient), np.inf)
+        if len(finite):
+            q = self.q[finite][:, finite]
+            system = scipy.sparse.identity(len(finite), format='csc') - q.tocsc()
+            steps[finite] = scipy.sparse.linalg.spsolve(system, np.ones(len(finite)))
+
+        self.expected = np.zeros(len(self.representatives))
+        self.expected[self.transient] = steps
+
+    # the orbit a game with the given start cells and first player's turn begins in
+    def start_orbit(self, starts, turn):
+        (x1, y1), (x2, y2) = starts
+        return self.orbit[self.encode(turn if self.phases == 2 else 0, y1 * self.width + x1, y2 * self.width + x2)]
+
+    # chance of meeting on each step 0..cutoff, found by pushing the start distribution through the chain one step at a
+    # time; whatever is left over after cutoff steps hasn't met yet
+    def distribution(self, starts, turn, cutoff):
+        result = np.zeros(cutoff + 1)
+        orbit = self.start_orbit(starts, turn)
+        if self.meeting[orbit]:
+            result[0] = 1
+            return result
+
+        probability = np.zeros(len(self.transient))
+        probability[np.searchsorted(self.transient, orbit)] = 1
+        q_transposed = self.q.T.tocsr()
+        for step in range(1, cutoff + 1):
+            result[step] = probability @ self.r
+            probability = q_transposed @ probability
+        return result
+
+
+# solved chains are kept for every grid size, protocol, and turn pairing that has been asked about
+@functools.lru_cache(maxsize=None)
+def chain(width, height, protocol, delta):
+    return Chain(width, height, protocol, delta)
+
+
+# fill in the level's default corners and alternating turns, and turn the arguments into hashable tuples
+def normalize(width, height, protocol, starts, turns):
+    if starts is None:
+        starts = default_starts(width, height)[:2]
+    if turns is None:
+        turns = (0, 1)
+    if len(starts) != 2:
+        raise ValueError('the exact solver only handles two players')
+    delta = (turns[0] ^ turns[1]) if protocol == 'every other' else 0
+    return tuple(tuple(start) for start in starts), turns[0], delta
+
+
+# expected number of steps before two players meet (inf if they might never meet)
+@functools.lru_cache(maxsize=None)
+def solve_expected_steps(width, height, protocol, starts, turn, delta):
+    solved = chain(width, height, protocol, delta)
+    return float(solved.expected[solved.start_orbit(starts, turn)])
+
+
+def expected_steps(width, height, protocol='random', starts=None, turns=None):
+    starts, turn, delta = normalize(width, height, protocol, starts, turns)
+    return solve_expected_steps(width, height, protocol, starts, turn, delta)
+
+
+# expected game time in seconds before two players meet
+def expected_time(width, height, protocol='random', starts=None, turns=None):
+    return expected_steps(width, height, protocol, starts, turns) * STEP_TIME
+
+
+# meeting_distribution(...)[k] is the chance the two players meet on step k
+def meeting_distribution(width, height, protocol='random', starts=None, turns=None, cutoff=DISTRIBUTION_CUTOFF):
+    starts, turn, delta = normalize(width, height, protocol, starts, turns)
+    return chain(width, height, protocol, delta).distribution(starts, turn, cutoff)
@@ -1,8 +1,11 @@
 # file: menu.py
-# purpose: the menu screens for the game that the user is able to navigate through
+# purpose: the menu screens for the game that the user is able to navigate through. each screen is built once, and only
+#          the values on it (like the number of players or the grid size) are rendered again when they change
 
 import pygame
 from settings import *
+from labels import load_font
+from widgets import Screen
 import datetime
 
 
@@ -14,80 +17,21 @@ class Menu:
         self.white = (255, 255, 255)
         self.dark = (70, 70, 70)
 
-        # three main fonts used for title, captions, and buttons
-        self.title_font = pygame.font.Font('freesansbold.ttf', 64)
-        self.caption_font = pygame.font.Font('freesansbold.ttf', 32)
-        self.button_font = pygame.font.Font('freesansbold.ttf', 20)
-
-        # title and captions are used to display plain text
-        self.title = self.title_font.render('Wandering in the Woods', True, self.white)  # rendered title
-        self.caption = self.caption_font.render('Pick a level', True, self.white)  # initial caption on title screen
-        self.caption2 = self.caption_font.render('', True, self.white)
-        self.caption3 = self.caption_font.render('', True, self.white)
-        self.caption4 = self.caption_font.render('', True, self.white)
-        self.caption5 = self.caption_font.render('', True, self.white)
-
-        # rectangle objects for title and captions
-        self.titleRect = self.title.get_rect()
-        self.captionRect = self.caption.get_rect()
-        self.caption2Rect = self.caption2.get_rect()
-        self.caption3Rect = self.caption3.get_rect()
-        self.caption4Rect = self.caption4.get_rect()
-        self.caption5Rect = self.caption5.get_rect()
-
-        # used in situations where user is setting the value of one of the level settings
-        self.value1 = self.caption_font.render('', True, self.white)
-        self.value2 = self.caption_font.render('', True, self.white)
-
-        # rectangle objects for values
-        self.value1Rect = self.value1.get_rect()
-        self.value2Rect = self.value2.get_rect()
-
-        # options are the text displayed on buttons
-        self.option1 = self.button_font.render('Grades K-2', True, self.white)  # button 1 text on title screen
-        self.option2 = self.button_font.render('Grades 3-5', True, self.white)  # button 2 text on title screen
-        self.option3 = self.button_font.render('Grades 6-8', True, self.white)  # button 3 text on title screen
-        self.option4 = self.button_font.render('', True, self.white)
-        self.option5 = self.button_font.render('', True, self.white)
-
-        # rectangle objects for options
-        self.option1Rect = self.option1.get_rect()
-        self.option2Rect = self.option2.get_rect()
-        self.option3Rect = self.option3.get_rect()
-        self.option4Rect = self.option4.get_rect()
-        self.option5Rect = self.option5.get_rect()
-
-        self.button1Rect = self.option1.get_rect()
-        self.button2Rect = self.option2.get_rect()
-        self.button3Rect = self.option3.get_rect()
-        self.button4Rect = self.option4.get_rect()
-        self.button5Rect = self.option5.get_rect()
-
-        # initialize size and positions for components used for title screen
-        self.titleRect.center = (SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 200)
-        self.captionRect.center = (SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 50)
-
-        self.option1Rect.center = ((SCREEN_WIDTH / 2) - 210, (SCREEN_HEIGHT / 2) + 70)
-        self.option2Rect.center = ((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) + 70)
-        self.option3Rect.center = ((SCREEN_WIDTH / 2) + 210, (SCREEN_HEIGHT / 2) + 70)
-
-        self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 300, (SCREEN_HEIGHT / 2) + 10, 180, 120)
-        self.button2Rect = pygame.Rect((SCREEN_WIDTH / 2) - 90, (SCREEN_HEIGHT / 2) + 10, 180, 120)
-        self.button3Rect = pygame.Rect((SCREEN_WIDTH / 2) + 120, (SCREEN_HEIGHT / 2) + 10, 180, 120)
-
-        self.started = False  # true when the player hits the confirm button on screen3
+        # the fonts used for the title, captions, buttons and smaller text, and the game over stats
+        self.title_font = load_font(64)
+        self.caption_font = load_font(32)
+        self.button_font = load_font(20)
+        self.text_font = load_font(20)
+        self.stats_font = load_font(15)
+
+        self.started = False  # true when the player hits the confirm button on the last screen before the level
         self.level_selected = 0  # this value updates to match what options was picked on the title screen
         self.over = False  # true when the game is over
-        self.instruction = False  # true when the player clicks the confirm button on the instruction screen
-        self.playerNum = 2  # default number of players in a level is two, but is updated on screen1
+        self.instruction = False  # true when the instructions for placing the players are shown over the level
+        self.playerNum = 2  # default number of players in a level is two, but is updated on the players screen
         self.width = 5  # default grid width in tiles
         self.height = 5  # default grid height in tiles
 
-        self.screen1 = False  # true when on screen1
-        self.screen2 = False  # true when on screen2
-        self.screen3 = False  # true when on screen3
-        self.screen4 = False  # true when on screen4
-
         self.protocols = ['random', 'every other']  # two different protocol options
         self.pro_index = 0  # default is 0 for the 'random' protocol
 
@@ -97,555 +41,256 @@ class Menu:
         self.wander = ''
         self.best_width = 0
         self.best_height = 0
+        self.expected_time = None  # exact expected time for the game that just ended; only known for two players
+
+        # every screen, built the first time it is shown so only the title screen is built before the game starts.
+        # 'over' and 'instructions' are drawn over the level, the rest fill the screen
+        self.builders = {'title': self.title_screen, 'k2': lambda: self.ready_screen(10),
+                         'players': self.players_screen, 'size': self.size_screen, 'protocol': self.protocol_screen,
+                         'ready': lambda: self.ready_screen(110), 'over': self.over_screen,
+                         'instructions': self.instructions_screen}
+        self.screens = {}  # name -> screen, for the screens built so far
+        self.screen = 'title'  # the screen being shown, or None once the level has started
+
+    # the screen with the given name, building it if it hasn't been shown before
+    def get_screen(self, name):
+        if name not in self.screens:
+            self.screens[name] = self.builders[name]()
+        return self.screens[name]
+
+    # title screen: pick a level
+    def title_screen(self):
+        screen = Screen(self.white, self.dark)
+        screen.label(self.title_font, 'Wandering in the Woods', center=(SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 200))
+        screen.label(self.caption_font, 'Pick a level', center=(SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 50))
+        screen.button('K-2', self.button_font, 'Grades K-2',
+                      ((SCREEN_WIDTH / 2) - 300, (SCREEN_HEIGHT / 2) + 10, 180, 120),
+                      ((SCREEN_WIDTH / 2) - 210, (SCREEN_HEIGHT / 2) + 70))
+        screen.button('3-5', self.button_font, 'Grades 3-5',
+                      ((SCREEN_WIDTH / 2) - 90, (SCREEN_HEIGHT / 2) + 10, 180, 120),
+                      ((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) + 70))
+        screen.button('6-8', self.button_font, 'Grades 6-8',
+                      ((SCREEN_WIDTH / 2) + 120, (SCREEN_HEIGHT / 2) + 10, 180, 120),
+                      ((SCREEN_WIDTH / 2) + 210, (SCREEN_HEIGHT / 2) + 70))
+        return screen
+
+    # the basic instructions shown right before a level starts, with the confirm button `top` pixels below the middle
+    # of the screen. the confirm button is pressed as soon as the mouse goes down, unlike the buttons on other screens
+    def ready_screen(self, top):
+        screen = Screen(self.white, self.dark, pygame.MOUSEBUTTONDOWN)
+        first = screen.label(self.text_font, 'Two players will wander in the woods until they find each other. ',
+                             center=(SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 50))
+        # the second line starts where it would if it were as wide as the first line and centered under it
+        screen.label(self.text_font, 'The time and the amount of moves they take is displayed on the right side of the '
+                                     'screen.', topleft=(first.rect.left - 115, first.rect.top + 30))
+        screen.button('confirm', self.button_font, 'Confirm',
+                      ((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + top, 150, 80),
+                      ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + top + 42))
+        return screen
+
+    # the confirm button at the bottom of the level settings screens
+    def confirm_button(self, screen):
+        screen.button('confirm', self.button_font, 'Confirm',
+                      ((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 110, 150, 80),
+                      ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 152))
+
+    # players screen: pick the number of players
+    def players_screen(self):
+        screen = Screen(self.white, self.dark)
+        screen.label(self.caption_font, 'Select number of players.',
+                     center=((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50))
+        screen.button('fewer', self.button_font, '<-', ((SCREEN_WIDTH / 2) - 140, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) - 105, (SCREEN_HEIGHT / 2) + 60))
+        screen.button('more', self.button_font, '->', ((SCREEN_WIDTH / 2) + 60, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) + 95, (SCREEN_HEIGHT / 2) + 60))
+        screen.label(self.text_font, self.playerNum, 'players',
+                     center=((SCREEN_WIDTH / 2) - 7, (SCREEN_HEIGHT / 2) + 60))
+        self.confirm_button(screen)
+        return screen
+
+    # size screen: pick the width and height of the grid
+    def size_screen(self):
+        screen = Screen(self.white, self.dark)
+        screen.label(self.caption_font, 'Select grid size.', center=((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50))
+        screen.label(self.text_font, 'Width', center=((SCREEN_WIDTH / 2) - 200, (SCREEN_HEIGHT / 2) + 20))
+        screen.label(self.text_font, 'Height', center=((SCREEN_WIDTH / 2) + 190, (SCREEN_HEIGHT / 2) + 20))
+        screen.button('narrower', self.button_font, '<-', ((SCREEN_WIDTH / 2) - 335, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) - 300, (SCREEN_HEIGHT / 2) + 60))
+        screen.button('wider', self.button_font, '->', ((SCREEN_WIDTH / 2) - 135, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 60))
+        screen.label(self.text_font, self.width, 'width', center=((SCREEN_WIDTH / 2) - 202, (SCREEN_HEIGHT / 2) + 60))
+        screen.button('shorter', self.button_font, '<-', ((SCREEN_WIDTH / 2) + 55, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) + 90, (SCREEN_HEIGHT / 2) + 60))
+        screen.button('taller', self.button_font, '->', ((SCREEN_WIDTH / 2) + 255, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) + 290, (SCREEN_HEIGHT / 2) + 60))
+        screen.label(self.text_font, self.height, 'height',
+                     center=((SCREEN_WIDTH / 2) + 192, (SCREEN_HEIGHT / 2) + 60))
+        self.confirm_button(screen)
+        return screen
+
+    # protocol screen: pick the wandering protocol
+    def protocol_screen(self):
+        screen = Screen(self.white, self.dark)
+        screen.label(self.caption_font, 'Select wandering protocol.',
+                     center=((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50))
+        screen.button('previous', self.button_font, '<-', ((SCREEN_WIDTH / 2) - 150, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) - 115, (SCREEN_HEIGHT / 2) + 60))
+        screen.button('next', self.button_font, '->', ((SCREEN_WIDTH / 2) + 70, (SCREEN_HEIGHT / 2) + 40, 70, 40),
+                      ((SCREEN_WIDTH / 2) + 105, (SCREEN_HEIGHT / 2) + 60))
+        screen.label(self.text_font, self.protocols[self.pro_index], 'protocol',
+                     center=((SCREEN_WIDTH / 2) - 7, (SCREEN_HEIGHT / 2) + 60))
+        self.confirm_button(screen)
+        return screen
+
+    # the box drawn over the level for the game over and instructions screens
+    def box(self, screen):
+        screen.box(self.dark, ((SCREEN_WIDTH / 4), (SCREEN_HEIGHT / 4), 500, 350))
+        screen.box('black', ((SCREEN_WIDTH / 4) + 4, (SCREEN_HEIGHT / 4) + 4, 492, 342))
+
+    # game over screen, with the stats down the left side
+    def over_screen(self):
+        screen = Screen(self.white, self.dark)
+        self.box(screen)
+        screen.label(self.text_font, 'All of the players have found each other!',
+                     center=((SCREEN_WIDTH / 2) + 10, (SCREEN_HEIGHT / 2) - 70))
+        screen.button('reset', self.button_font, 'Reset', ((SCREEN_WIDTH / 2) - 175, (SCREEN_HEIGHT / 2) - 10, 150, 80),
+                      ((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 32))
+        screen.button('main menu', self.button_font, 'Main Menu',
+                      ((SCREEN_WIDTH / 2) + 45, (SCREEN_HEIGHT / 2) - 10, 150, 80),
+                      ((SCREEN_WIDTH / 2) + 120, (SCREEN_HEIGHT / 2) + 32))
+
+        screen.box(self.dark, (10, 192, 220, 350))
+        screen.box('black', (14, 196, 212, 342))
+        for y, stat in enumerate(['average', 'best', 'wander', 'dimensions', 'expected']):
+            screen.label(self.stats_font, '', stat, center=(120, 300 + 50 * y))
+        return screen
+
+    # instructions screen for placing the players on the 3-5 and 6-8 levels
+    def instructions_screen(self):
+        screen = Screen(self.white, self.dark)
+        self.box(screen)
+        first = screen.label(self.text_font, 'Use arrows keys to move players.',
+                             center=((SCREEN_WIDTH / 2) + 10, (SCREEN_HEIGHT / 2) - 70))
+        screen.label(self.text_font, 'Use the enter key to place the players.',
+                     topleft=(first.rect.left - 23, first.rect.top + 30))
+        screen.button('confirm', self.button_font, 'Confirm',
+                      ((SCREEN_WIDTH / 2) - 70, (SCREEN_HEIGHT / 2) + 20, 150, 80),
+                      ((SCREEN_WIDTH / 2) + 5, (SCREEN_HEIGHT / 2) + 62))
+        return screen
+
+    # switch to another screen, or to the level when name is None
+    def show(self, name):
+        self.screen = name
+        self.display_surface.fill('black')
 
     # deals with all player interaction with the menu screens and buttons, which helps the menu navigate between screens
+    # each click goes to the screen being shown when it happens, and the values shown on the screens are brought up to
+    # date afterwards
     def input(self, event_list):
-        # the title screen is displayed when a level has not been selected
-        if not self.level_selected:
-            for event in event_list:
-                if event.type == pygame.MOUSEBUTTONUP:
-                    # K-2 button is clicked
-                    if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button3Rect = pygame.Rect(0, 0, 0, 0)
-                        self.display_surface.fill('black')
-                        self.level_selected = 1
-                    # 3-5 button is clicked
-                    if self.button2Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button3Rect = pygame.Rect(0, 0, 0, 0)
-                        self.display_surface.fill('black')
-                        self.level_selected = 2
-                        self.screen1 = True
-                    # 6-8 button is clicked
-                    if self.button3Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                        self.button3Rect = pygame.Rect(0, 0, 0, 0)
-                        self.display_surface.fill('black')
-                        self.level_selected = 3
-                        self.screen1 = True
-
-        # level 1 is selected but the game has not started yet, so the basic instruction screen is shown
-        if self.level_selected == 1 and not self.started:
-            # the two description lines
-            self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-            self.caption = self.caption_font.render('Two players will wander in the woods until they find each other. ',
-                                                    True, self.white)
-            self.captionRect = self.caption.get_rect()
-            self.captionRect.center = (SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 50)
-            self.caption2 = self.caption_font.render('The time and the amount of moves they take is displayed on the '
-                                                     'right side of the screen.', True, self.white)
-            self.caption2Rect = self.caption.get_rect()
-            self.caption2Rect.center = ((SCREEN_WIDTH / 2) - 115, (SCREEN_HEIGHT / 2) - 20)
-            ###
-
-            # the confirm button
-            self.option1 = self.button_font.render('Confirm', True, self.white)
-            self.option1Rect = self.option1.get_rect()
-            self.button1Rect = self.option1.get_rect()
-            self.option1Rect.center = ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 52)
-            self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 10, 150, 80)
-            ###
-
-            for event in event_list:
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    # the confirm button is clicked
-                    if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                        self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                        self.display_surface.fill('black')
-                        self.started = True
-
-        # 3-5 or 6-8 levels are selected
-        if self.level_selected == 2 or self.level_selected == 3:
-            # screen 1
-            # instruction caption
-            self.caption_font = pygame.font.Font('freesansbold.ttf', 32)
-            self.caption = self.caption_font.render('Select number of players.', True, self.white)
-            self.captionRect = self.caption.get_rect()
-            self.captionRect.center = ((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50)
-            ###
-
-            # arrow buttons
-            self.option1 = self.button_font.render('<-', True, self.white)
-            self.option1Rect = self.option1.get_rect()
-            self.button1Rect = self.option1.get_rect()
-            self.option1Rect.center = ((SCREEN_WIDTH / 2) - 105, (SCREEN_HEIGHT / 2) + 60)
-            self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 140, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-
-            self.option2 = self.button_font.render('->', True, self.white)
-            self.option2Rect = self.option2.get_rect()
-            self.button2Rect = self.option2.get_rect()
-            self.option2Rect.center = ((SCREEN_WIDTH / 2) + 95, (SCREEN_HEIGHT / 2) + 60)
-            self.button2Rect = pygame.Rect((SCREEN_WIDTH / 2) + 60, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-            ###
-
-            # player number value
-            self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-
-            self.value1 = self.caption_font.render(str(self.playerNum), True, self.white)
-            self.value1Rect = self.value1.get_rect()
-            self.value1Rect.center = ((SCREEN_WIDTH / 2) - 7, (SCREEN_HEIGHT / 2) + 60)
-            ###
-
-            # confirm button
-            self.option3 = self.button_font.render('Confirm', True, self.white)
-            self.option3Rect = self.option3.get_rect()
-            self.button3Rect = self.option3.get_rect()
-            self.option3Rect.center = ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 152)
-            self.button3Rect = pygame.Rect((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 110, 150, 80)
-            ###
-
-            if self.screen1:
-                for event in event_list:
-                    if event.type == pygame.MOUSEBUTTONUP:
-                        # left arrow button is clicked
-                        if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.playerNum > 2:
-                                self.playerNum = self.playerNum - 1
-                        # right arrow button is clicked
-                        if self.button2Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.playerNum < 4:
-                                self.playerNum = self.playerNum + 1
-                        # confirm button is clicked
-                        if self.button3Rect.collidepoint(pygame.mouse.get_pos()):
-                            self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                            self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                            self.button3Rect = pygame.Rect(0, 0, 0, 0)
-
-                            self.screen2 = True
-                            self.display_surface.fill('black')
-
-            if self.screen2:
-                # screen 2
-                # instruction caption
-                self.caption_font = pygame.font.Font('freesansbold.ttf', 32)
-                self.caption = self.caption_font.render('Select grid size.', True, self.white)
-                self.captionRect = self.caption.get_rect()
-                self.captionRect.center = ((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50)
-                ###
-
-                # width caption
-                self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-
-                self.caption2 = self.caption_font.render('Width', True, self.white)
-                self.caption2Rect = self.caption2.get_rect()
-                self.caption2Rect.center = ((SCREEN_WIDTH / 2) - 200, (SCREEN_HEIGHT / 2) + 20)
-                ###
-
-                # height caption
-                self.caption3 = self.caption_font.render('Height', True, self.white)
-                self.caption3Rect = self.caption3.get_rect()
-                self.caption3Rect.center = ((SCREEN_WIDTH / 2) + 190, (SCREEN_HEIGHT / 2) + 20)
-                ###
-
-                # width arrows
-                self.option1 = self.button_font.render('<-', True, self.white)
-                self.option1Rect = self.option1.get_rect()
-                self.button1Rect = self.option1.get_rect()
-                self.option1Rect.center = ((SCREEN_WIDTH / 2) - 300, (SCREEN_HEIGHT / 2) + 60)
-                self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 335, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-
-                self.option2 = self.button_font.render('->', True, self.white)
-                self.option2Rect = self.option2.get_rect()
-                self.button2Rect = self.option2.get_rect()
-                self.option2Rect.center = ((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 60)
-                self.button2Rect = pygame.Rect((SCREEN_WIDTH / 2) - 135, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-                ###
-
-                # width value
-                self.value1 = self.caption_font.render(str(self.width), True, self.white)
-                self.value1Rect = self.value1.get_rect()
-                self.value1Rect.center = ((SCREEN_WIDTH / 2) - 202, (SCREEN_HEIGHT / 2) + 60)
-                ###
-
-                # height arrows
-                self.option3 = self.button_font.render('<-', True, self.white)
-                self.option3Rect = self.option3.get_rect()
-                self.button3Rect = self.option3.get_rect()
-                self.option3Rect.center = ((SCREEN_WIDTH / 2) + 90, (SCREEN_HEIGHT / 2) + 60)
-                self.button3Rect = pygame.Rect((SCREEN_WIDTH / 2) + 55, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-
-                self.option4 = self.button_font.render('->', True, self.white)
-                self.option4Rect = self.option4.get_rect()
-                self.button4Rect = self.option4.get_rect()
-                self.option4Rect.center = ((SCREEN_WIDTH / 2) + 290, (SCREEN_HEIGHT / 2) + 60)
-                self.button4Rect = pygame.Rect((SCREEN_WIDTH / 2) + 255, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-                ###
-
-                # height value
-                self.value2 = self.caption_font.render(str(self.height), True, self.white)
-                self.value2Rect = self.value2.get_rect()
-                self.value2Rect.center = ((SCREEN_WIDTH / 2) + 192, (SCREEN_HEIGHT / 2) + 60)
-                ###
-
-                # confirm button
-                self.option5 = self.button_font.render('Confirm', True, self.white)
-                self.option5Rect = self.option5.get_rect()
-                self.button5Rect = self.option5.get_rect()
-                self.option5Rect.center = ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 152)
-                self.button5Rect = pygame.Rect((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 110, 150, 80)
-                ###
-
-                for event in event_list:
-                    if event.type == pygame.MOUSEBUTTONUP:
-                        # left width arrow is clicked
-                        if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.width > 2:
-                                self.width = self.width - 1
-                        # right width arrow is clicked
-                        if self.button2Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.width < 12:
-                                self.width = self.width + 1
-                        # left height arrow is clicked
-                        if self.button3Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.height > 2:
-                                self.height = self.height - 1
-                        # right height arrow is clicked
-                        if self.button4Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.height < 12:
-                                self.height = self.height + 1
-                        # confirmed button is clicked
-                        if self.button5Rect.collidepoint(pygame.mouse.get_pos()):
-                            if not self.screen1:
-                                self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button3Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button4Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button5Rect = pygame.Rect(0, 0, 0, 0)
-
-                                # if level is 3-5 then go to screen 3
-                                if self.level_selected == 2:
-                                    self.screen2 = False
-                                    self.screen3 = True
-                                # if level 6-8 then go to screen 4
-                                else:
-                                    self.screen4 = True
-                                self.display_surface.fill('black')
-                            else:
-                                self.screen1 = False
-
-            if self.screen3:
-                # screen 3
-                # two captions used for instructions
-                self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-                self.caption = self.caption_font.render(
-                    'Two players will wander in the woods until they find each other. ',
-                    True, self.white)
-                self.captionRect = self.caption.get_rect()
-                self.captionRect.center = (SCREEN_WIDTH / 2, (SCREEN_HEIGHT / 2) - 50)
-
-                self.caption2 = self.caption_font.render(
-                    'The time and the amount of moves they take is displayed on the '
-                    'right side of the screen.', True, self.white)
-                self.caption2Rect = self.caption.get_rect()
-                self.caption2Rect.center = ((SCREEN_WIDTH / 2) - 115, (SCREEN_HEIGHT / 2) - 20)
-                ###
-
-                # confirm button
-                self.option1 = self.button_font.render('Confirm', True, self.white)
-                self.option1Rect = self.option1.get_rect()
-                self.button1Rect = self.option1.get_rect()
-                self.option1Rect.center = ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 152)
-                self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 110, 150, 80)
-                ###
-
-                for event in event_list:
-                    if event.type == pygame.MOUSEBUTTONDOWN:
-                        # confirm button is clicked
-                        if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                            # if level 3-5 is selected, start the level
-                            if self.level_selected == 2:
-                                if not self.screen2:
-                                    self.button1Rect = pygame.Rect(0, 0, 0, 0)
-
-                                    self.screen3 = False
-                                    self.display_surface.fill('black')
-                                    self.started = True
-                                else:
-                                    self.screen2 = False
-                            # if level 6-8 is selected, go to screen 4
-                            if self.level_selected == 3:
-                                if not self.screen4:
-                                    self.button1Rect = pygame.Rect(0, 0, 0, 0)
-
-                                    self.screen3 = False
-                                    self.display_surface.fill('black')
-                                    self.started = True
-                                else:
-                                    self.screen4 = False
-
-            if self.screen4:
-                # screen 4
-                # instruction caption
-                self.caption_font = pygame.font.Font('freesansbold.ttf', 32)
-                self.caption = self.caption_font.render('Select wandering protocol.', True, self.white)
-                self.captionRect = self.caption.get_rect()
-                self.captionRect.center = ((SCREEN_WIDTH / 2), (SCREEN_HEIGHT / 2) - 50)
-                ###
-
-                # arrow buttons
-                self.option1 = self.button_font.render('<-', True, self.white)
-                self.option1Rect = self.option1.get_rect()
-                self.button1Rect = self.option1.get_rect()
-                self.option1Rect.center = ((SCREEN_WIDTH / 2) - 115, (SCREEN_HEIGHT / 2) + 60)
-                self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 150, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-
-                self.option2 = self.button_font.render('->', True, self.white)
-                self.option2Rect = self.option2.get_rect()
-                self.button2Rect = self.option2.get_rect()
-                self.option2Rect.center = ((SCREEN_WIDTH / 2) + 105, (SCREEN_HEIGHT / 2) + 60)
-                self.button2Rect = pygame.Rect((SCREEN_WIDTH / 2) + 70, (SCREEN_HEIGHT / 2) + 40, 70, 40)
-                ###
-
-                # protocol value
-                self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-                self.value1 = self.caption_font.render(self.protocols[self.pro_index], True, self.white)
-                self.value1Rect = self.value1.get_rect()
-                self.value1Rect.center = ((SCREEN_WIDTH / 2) - 7, (SCREEN_HEIGHT / 2) + 60)
-                ###
-
-                # confirm button
-                self.option3 = self.button_font.render('Confirm', True, self.white)
-                self.option3Rect = self.option3.get_rect()
-                self.button3Rect = self.option3.get_rect()
-                self.option3Rect.center = ((SCREEN_WIDTH / 2) - 5, (SCREEN_HEIGHT / 2) + 152)
-                self.button3Rect = pygame.Rect((SCREEN_WIDTH / 2) - 80, (SCREEN_HEIGHT / 2) + 110, 150, 80)
-                ###
-
-                for event in event_list:
-                    if event.type == pygame.MOUSEBUTTONUP:
-                        # left arrow is clicked
-                        if self.button1Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.pro_index == 0:
-                                self.pro_index = 2
-                            else:
-                                self.pro_index = self.pro_index - 1
-                        # right arrow is clicked
-                        if self.button2Rect.collidepoint(pygame.mouse.get_pos()):
-                            if self.pro_index == 2:
-                                self.pro_index = 0
-                            else:
-                                self.pro_index = self.pro_index + 1
-                        # confirm button is clicked, start the game
-                        if self.button3Rect.collidepoint(pygame.mouse.get_pos()):
-                            if not self.screen2:
-                                self.button1Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button2Rect = pygame.Rect(0, 0, 0, 0)
-                                self.button3Rect = pygame.Rect(0, 0, 0, 0)
-
-                                self.screen4 = False
-                                self.screen3 = True
-                                self.display_surface.fill('black')
-                            else:
-                                self.screen2 = False
+        for event in event_list:
+            if self.screen is None:
+                break
+            pressed = self.get_screen(self.screen).press(event)
+            if pressed is not None:
+                self.choose(pressed)
+
+        if self.screen == 'players':
+            self.get_screen('players').set('players', self.playerNum)
+        if self.screen == 'size':
+            self.get_screen('size').set('width', self.width)
+            self.get_screen('size').set('height', self.height)
+        if self.screen == 'protocol':
+            self.get_screen('protocol').set('protocol', self.protocols[self.pro_index])
+
+    # act on a button pressed on the screen being shown
+    def choose(self, pressed):
+        # title screen: K-2 goes straight to its instructions, the others go on to pick the level settings
+        if self.screen == 'title':
+            self.level_selected = {'K-2': 1, '3-5': 2, '6-8': 3}[pressed]
+            self.show('k2' if self.level_selected == 1 else 'players')
+
+        elif self.screen == 'players':
+            if pressed == 'fewer':
+                self.playerNum = max(2, self.playerNum - 1)
+            elif pressed == 'more':
+                self.playerNum = min(MAX_PLAYERS, self.playerNum + 1)
+            else:
+                self.show('size')
+
+        elif self.screen == 'size':
+            if pressed == 'narrower':
+                self.width = self.smaller(self.width)
+            elif pressed == 'wider':
+                self.width = self.bigger(self.width)
+            elif pressed == 'shorter':
+                self.height = self.smaller(self.height)
+            elif pressed == 'taller':
+                self.height = self.bigger(self.height)
+            else:  # 3-5 goes to the instructions, 6-8 picks the wandering protocol first
+                self.show('ready' if self.level_selected == 2 else 'protocol')
+
+        elif self.screen == 'protocol':
+            if pressed == 'previous':
+                self.pro_index = (self.pro_index - 1) % len(self.protocols)
+            elif pressed == 'next':
+                self.pro_index = (self.pro_index + 1) % len(self.protocols)
+            else:
+                self.show('ready')
+
+        else:  # the confirm button on the last screen starts the level
+            self.show(None)
+            self.started = True
+
+    # the next grid size up: one more cell at a time up to MAX_GRID_SIZE, then on through the large grid sizes
+    def bigger(self, size):
+        if size < MAX_GRID_SIZE:
+            return size + 1
+        larger = [large for large in LARGE_GRID_SIZES if large > size]
+        return larger[0] if larger else size
+
+    # the next grid size down, back through the large grid sizes and then one cell at a time down to 2
+    def smaller(self, size):
+        if size > MAX_GRID_SIZE:
+            smaller = [large for large in LARGE_GRID_SIZES if large < size]
+            return smaller[-1] if smaller else MAX_GRID_SIZE
+        return max(2, size - 1)
 
     # game over screen
-    # only displays once all the players have found each other
+    # only displays once all the players have found each other. the stats are brought up to date, but only rendered
+    # again when they changed
     def game_over(self):
         self.over = True
 
-        # caption
-        self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-        self.caption = self.caption_font.render('All of the players have found each other!',
-                                                True, self.white)
-        self.captionRect = self.caption.get_rect()
-        self.captionRect.center = ((SCREEN_WIDTH / 2) + 10, (SCREEN_HEIGHT / 2) - 70)
-        ###
-
-        # reset button
-        self.option1 = self.button_font.render('Reset', True, self.white)
-        self.option1Rect = self.option1.get_rect()
-        self.button1Rect = self.option1.get_rect()
-        self.option1Rect.center = ((SCREEN_WIDTH / 2) - 100, (SCREEN_HEIGHT / 2) + 32)
-        self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 175, (SCREEN_HEIGHT / 2) - 10, 150, 80)
-        ###
-
-        # main menu button
-        self.option2 = self.button_font.render('Main Menu', True, self.white)
-        self.option2Rect = self.option2.get_rect()
-        self.button2Rect = self.option2.get_rect()
-        self.option2Rect.center = ((SCREEN_WIDTH / 2) + 120, (SCREEN_HEIGHT / 2) + 32)
-        self.button2Rect = pygame.Rect((SCREEN_WIDTH / 2) + 45, (SCREEN_HEIGHT / 2) - 10, 150, 80)
-        ###
-
-        # average time stat
-        self.caption_font = pygame.font.Font('freesansbold.ttf', 15)
-        self.caption2 = self.caption_font.render('Average time: {}'.format(
-            datetime.timedelta(seconds=round(self.average_time))), True, self.white)
-        self.caption2Rect = self.caption2.get_rect()
-        self.caption2Rect.center = (120, 300)
-        ###
-
-        # best time stat
-        self.caption3 = self.caption_font.render('Best time: {}'.format(
-            datetime.timedelta(seconds=round(self.best_time))), True, self.white)
-        self.caption3Rect = self.caption3.get_rect()
-        self.caption3Rect.center = (120, 350)
-        ###
-
-        # wandering protocol stat
-        self.caption4 = self.caption_font.render('Best wander: {}'.format(self.wander), True, self.white)
-        self.caption4Rect = self.caption4.get_rect()
-        self.caption4Rect.center = (120, 400)
-        ###
-
-        # dimensions stat
-        self.caption5 = self.caption_font.render(
-            'Best dimensions: {} x {}'.format(round(self.best_width/64), round(self.best_height/64)), True, self.white)
-        self.caption5Rect = self.caption5.get_rect()
-        self.caption5Rect.center = (120, 450)
-        ###
+        screen = self.get_screen('over')
+        screen.set('average', 'Average time: {}'.format(datetime.timedelta(seconds=round(self.average_time))))
+        screen.set('best', 'Best time: {}'.format(datetime.timedelta(seconds=round(self.best_time))))
+        screen.set('wander', 'Best wander: {}'.format(self.wander))
+        screen.set('dimensions', 'Best dimensions: {} x {}'.format(round(self.best_width/64),
+                                                                     round(self.best_height/64)))
+        if self.expected_time is None:
+            screen.set('expected', '')
+        elif self.expected_time == float('inf'):
+            screen.set('expected', 'Expected time: never')
+        else:
+            screen.set('expected', 'Expected time: {}'.format(datetime.timedelta(seconds=round(self.expected_time))))
 
     # instructions screen
     # only displays on the 3-5 or 6-8 levels to instruct the user on how to place the players in the grid
     def instructions(self):
         self.instruction = True
-        # instruction captions
-        self.caption_font = pygame.font.Font('freesansbold.ttf', 20)
-        self.caption = self.caption_font.render('Use arrows keys to move players.',
-                                                True, self.white)
-        self.captionRect = self.caption.get_rect()
-        self.captionRect.center = ((SCREEN_WIDTH / 2) + 10, (SCREEN_HEIGHT / 2) - 70)
-
-        self.caption2 = self.caption_font.render('Use the enter key to place the players.', True, self.white)
-        self.caption2Rect = self.caption.get_rect()
-        self.caption2Rect.center = ((SCREEN_WIDTH / 2) - 13, (SCREEN_HEIGHT / 2) - 40)
-        ###
-
-        # confirm button
-        self.option1 = self.button_font.render('Confirm', True, self.white)
-        self.option1Rect = self.option1.get_rect()
-        self.button1Rect = self.option1.get_rect()
-        self.option1Rect.center = ((SCREEN_WIDTH / 2) + 5, (SCREEN_HEIGHT / 2) + 62)
-        self.button1Rect = pygame.Rect((SCREEN_WIDTH / 2) - 70, (SCREEN_HEIGHT / 2) + 20, 150, 80)
-        ###
 
     def display(self):
-        if self.level_selected == 0:
-            # display title screen components
-            self.display_surface.blit(self.title, self.titleRect)
-
-            self.display_surface.blit(self.caption, self.captionRect)
-
-            pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-            pygame.draw.rect(self.display_surface, self.dark, self.button2Rect)
-            pygame.draw.rect(self.display_surface, self.dark, self.button3Rect)
-            self.display_surface.blit(self.option1, self.option1Rect)
-            self.display_surface.blit(self.option2, self.option2Rect)
-            self.display_surface.blit(self.option3, self.option3Rect)
-
-        if self.level_selected == 1 and not self.started:
-            # display instructions for K-2 level
-            self.display_surface.blit(self.caption, self.captionRect)
-            self.display_surface.blit(self.caption2, self.caption2Rect)
-
-            pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-            self.display_surface.blit(self.option1, self.option1Rect)
-
-        if self.level_selected == 2 or self.level_selected == 3 and not self.started:
-            if self.screen1:
-                # display screen 1 components
-                self.display_surface.blit(self.caption, self.captionRect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-                self.display_surface.blit(self.option1, self.option1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button2Rect)
-                self.display_surface.blit(self.option2, self.option2Rect)
-
-                self.display_surface.blit(self.value1, self.value1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button3Rect)
-                self.display_surface.blit(self.option3, self.option3Rect)
-
-            if self.screen2:
-                # display screen 2 components
-                self.display_surface.blit(self.caption, self.captionRect)
-                self.display_surface.blit(self.caption2, self.caption2Rect)
-                self.display_surface.blit(self.caption3, self.caption3Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-                self.display_surface.blit(self.option1, self.option1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button2Rect)
-                self.display_surface.blit(self.option2, self.option2Rect)
-
-                self.display_surface.blit(self.value1, self.value1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button3Rect)
-                self.display_surface.blit(self.option3, self.option3Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button4Rect)
-                self.display_surface.blit(self.option4, self.option4Rect)
-
-                self.display_surface.blit(self.value2, self.value2Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button5Rect)
-                self.display_surface.blit(self.option5, self.option5Rect)
-
-            if self.screen3:
-                # display screen 3 components
-                self.display_surface.blit(self.caption, self.captionRect)
-                self.display_surface.blit(self.caption2, self.caption2Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-                self.display_surface.blit(self.option1, self.option1Rect)
-
-            if self.screen4:
-                # display screen 4 components
-                self.display_surface.blit(self.caption, self.captionRect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-                self.display_surface.blit(self.option1, self.option1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button2Rect)
-                self.display_surface.blit(self.option2, self.option2Rect)
-
-                self.display_surface.blit(self.value1, self.value1Rect)
-
-                pygame.draw.rect(self.display_surface, self.dark, self.button3Rect)
-                self.display_surface.blit(self.option3, self.option3Rect)
-
+        if self.screen is not None:
+            self.get_screen(self.screen).draw(self.display_surface)
         if self.over:
-            # display game over screen components
-            pygame.draw.rect(self.display_surface, self.dark,
-                             pygame.Rect((SCREEN_WIDTH / 4), (SCREEN_HEIGHT / 4), 500, 350))
-            pygame.draw.rect(self.display_surface, 'black',
-                             pygame.Rect((SCREEN_WIDTH / 4) + 4, (SCREEN_HEIGHT / 4) + 4, 492, 342))
-
-            self.display_surface.blit(self.caption, self.captionRect)
-
-            pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-            self.display_surface.blit(self.option1, self.option1Rect)
-
-            pygame.draw.rect(self.display_surface, self.dark, self.button2Rect)
-            self.display_surface.blit(self.option2, self.option2Rect)
-
-            pygame.draw.rect(self.display_surface, self.dark,
-                             pygame.Rect(10, 192, 220, 350))
-            pygame.draw.rect(self.display_surface, 'black',
-                             pygame.Rect(14, 196, 212, 342))
-
-            self.display_surface.blit(self.caption2, self.caption2Rect)
-            self.display_surface.blit(self.caption3, self.caption3Rect)
-            self.display_surface.blit(self.caption4, self.caption4Rect)
-            self.display_surface.blit(self.caption5, self.caption5Rect)
-
+            self.get_screen('over').draw(self.display_surface)
         if self.instruction:
-            # display instruction screen components
-            pygame.draw.rect(self.display_surface, self.dark,
-                             pygame.Rect((SCREEN_WIDTH / 4), (SCREEN_HEIGHT / 4), 500, 350))
-            pygame.draw.rect(self.display_surface, 'black',
-                             pygame.Rect((SCREEN_WIDTH / 4) + 4, (SCREEN_HEIGHT / 4) + 4, 492, 342))
-
-            self.display_surface.blit(self.caption, self.captionRect)
-            self.display_surface.blit(self.caption2, self.caption2Rect)
+            self.get_screen('instructions').draw(self.display_surface)
 
-            pygame.draw.rect(self.display_surface, self.dark, self.button1Rect)
-            self.display_surface.blit(self.option1, self.option1Rect)
+    # true when display will draw something this frame, following the same checks display does, so the level knows
+    # the menu is covering the screen
+    def showing(self):
+        return self.screen is not None or self.over or self.instruction
 
     # continuously display components and handle user input
     def update(self, event_list):
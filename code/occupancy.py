@@ -0,0 +1,50 @@
+# file: occupancy.py
+# purpose: keeps track of which players stand in which grid cell, so meetings and "who is near me" questions only look
+#          at the cells involved instead of comparing every pair of players
+
+class Occupancy:
+    def __init__(self):
+        self.cells = {}  # (x, y) cell -> set of player indices standing in it
+
+    # put a player in a cell
+    def add(self, index, cell):
+        if cell in self.cells:
+            self.cells[cell].add(index)
+        else:
+            self.cells[cell] = {index}
+
+    # take a player out of a cell, forgetting the cell once it is empty
+    def remove(self, index, cell):
+        players = self.cells[cell]
+        players.discard(index)
+        if not players:
+            del self.cells[cell]
+
+    # a player finished a step from one cell to another
+    def move(self, index, old, new):
+        if old != new:
+            self.remove(index, old)
+            self.add(index, new)
+
+    # the players standing in a cell
+    def at(self, cell):
+        return self.cells.get(cell, ())
+
+    # the players within `distance` moves (up, down, left, or right) of a cell, including the ones standing in it
+    def within(self, cell, distance):
+        if distance == 0:
+            return list(self.at(cell))
+
+        x, y = cell
+        players = []
+        if (2 * distance + 1) ** 2 > len(self.cells):  # fewer occupied cells than cells in range, so check those
+            for (other_x, other_y), others in self.cells.items():
+                if abs(other_x - x) + abs(other_y - y) <= distance:
+                    players.extend(others)
+        else:
+            for dx in range(-distance, distance + 1):
+                reach = distance - abs(dx)
+                for dy in range(-reach, reach + 1):
+                    players.extend(self.at((x + dx, y + dy)))
+        return players
+
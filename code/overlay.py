@@ -3,175 +3,193 @@
 
 import pygame
 from settings import *
+from labels import Label, NumberLabel, load_font
+from support import character_icon
+from widgets import Screen
 import datetime
+import math
 
 
 class Overlay:
-    def __init__(self, players, player_num, selected_pro):
+    def __init__(self, players, player_num, selected_pro, seed=None, speed=1):
         # general setup
         self.display_surface = pygame.display.get_surface()  # display's surface
-        self.p_names = ['player1', 'player2', 'player3', 'player4']  # player names used for importing images
+        self.p_names = ['player{}'.format(index % 4 + 1) for index in range(len(players))]  # player image names
         self.players = players  # player objects
-        self.game_time = 0  # game time that starts once the level starts and all players are placed
+        self.game_time = 0  # simulated time that starts once the level starts and all players are placed
         self.playerNum = player_num  # number of players being used in the level
         self.selected_pro = selected_pro  # selected wandering protocol
+        self.seed = seed  # the seed for the random numbers of the game, so the game can be played again
+        self.speed = speed  # how many times faster than normal the game is played
+        self.effective_speed = None  # how fast the game really goes, when it can't keep up with self.speed
 
         # import the player surfaces
-        overlay_path = '..\\CPSC60500-Project\\graphics\\overlay\\'
-        self.players_surf = {player: pygame.image.load(f'{overlay_path}{player}.png').convert_alpha() for player in
-                             self.p_names}
+        self.players_surf = {player: character_icon(player) for player in set(self.p_names)}
 
         # labels
+        # every label is only rendered again when the value it shows changes, and the timer and move counters are
+        # built out of pre-rendered digits
         self.white = (255, 255, 255)
-        self.time_font = pygame.font.Font('freesansbold.ttf', 25)
-        self.label_font = pygame.font.Font('freesansbold.ttf', 16)
+        self.time_font = load_font(25)
+        self.label_font = load_font(16)
 
-        self.time_lbl = self.time_font.render('Time:', True, self.white)
-        self.time_lblRect = self.time_lbl.get_rect()
-        self.time_lblRect.center = (SCREEN_WIDTH - 98, 30)
+        self.time_lbl = Label(self.time_font, self.white, 'Time:', center=(SCREEN_WIDTH - 98, 30))
 
         # timer
-        self.time = self.time_font.render('{}'.format(datetime.timedelta(seconds=round(self.game_time))), True,
-                                          self.white)
-        self.timeRect = self.time.get_rect()
-        self.timeRect.center = (SCREEN_WIDTH - 98, 60)
-
-        # move counters for player 1 and player 2
-        self.p1_moves_lbl = self.label_font.render('Moves:', True, self.white)
-        self.p1_moves_lblRect = self.p1_moves_lbl.get_rect()
-        self.p1_moves_lblRect.center = (SCREEN_WIDTH - 98, 215)
-
-        self.p1_moves = self.label_font.render('{}'.format(self.players[0].moves), True, self.white)
-        self.p1_movesRect = self.p1_moves.get_rect()
-        self.p1_movesRect.center = (SCREEN_WIDTH - 98, 235)
-
-        self.p2_moves_lbl = self.label_font.render('Moves:', True, self.white)
-        self.p2_moves_lblRect = self.p2_moves_lbl.get_rect()
-        self.p2_moves_lblRect.center = (SCREEN_WIDTH - 98, 335)
-
-        self.p2_moves = self.label_font.render('{}'.format(self.players[1].moves), True, self.white)
-        self.p2_movesRect = self.p2_moves.get_rect()
-        self.p2_movesRect.center = (SCREEN_WIDTH - 98, 355)
-
-        # move counter for player 3
-        if self.playerNum >= 3:
-            self.p3_moves_lbl = self.label_font.render('Moves:', True, self.white)
-            self.p3_moves_lblRect = self.p3_moves_lbl.get_rect()
-            self.p3_moves_lblRect.center = (SCREEN_WIDTH - 98, 455)
-
-            self.p3_moves = self.label_font.render('{}'.format(self.players[2].moves), True, self.white)
-            self.p3_movesRect = self.p3_moves.get_rect()
-            self.p3_movesRect.center = (SCREEN_WIDTH - 98, 475)
-
-        # move counter for player 4
-        if self.playerNum == 4:
-            self.p4_moves_lbl = self.label_font.render('Moves:', True, self.white)
-            self.p4_moves_lblRect = self.p4_moves_lbl.get_rect()
-            self.p4_moves_lblRect.center = (SCREEN_WIDTH - 98, 575)
-
-            self.p4_moves = self.label_font.render('{}'.format(self.players[3].moves), True, self.white)
-            self.p4_movesRect = self.p4_moves.get_rect()
-            self.p4_movesRect.center = (SCREEN_WIDTH - 98, 655)
+        self.time = NumberLabel(self.time_font, self.white, self.clock(), center=(SCREEN_WIDTH - 98, 60))
+
+        # speed control, between the timer and the players
+        self.speed_lbl = Label(self.label_font, self.white, 'Speed:', center=(SCREEN_WIDTH - 98, 92))
+        self.speed_control = Screen(self.white, (70, 70, 70))
+        self.speed_control.button('slower', self.label_font, '<', (SCREEN_WIDTH - 170, 104, 30, 24),
+                                  (SCREEN_WIDTH - 155, 116))
+        self.speed_control.label(self.label_font, self.speed_text(), 'speed', center=(SCREEN_WIDTH - 98, 116))
+        self.speed_control.button('faster', self.label_font, '>', (SCREEN_WIDTH - 56, 104, 30, 24),
+                                  (SCREEN_WIDTH - 41, 116))
+
+        # move counters, one per player
+        self.layout()
+        self.moves_lbls = []
+        if self.playerNum <= 4:
+            self.moves_lbls = [Label(self.label_font, self.white, 'Moves:',
+                                     center=(SCREEN_WIDTH - 98, 215 + 120 * index)) for index in range(self.playerNum)]
+
+        self.moves = [NumberLabel(self.label_font, self.white, self.players[index].moves, **self.moves_anchor(index))
+                      for index in range(self.playerNum)]
+
+        # seed, between the players and the board size
+        self.seed_lbl = Label(self.label_font, self.white, self.seed_text(), center=(SCREEN_WIDTH - 98, 645))
 
         # dimensions
-        self.dim_lbl = self.label_font.render('Board Size:', True, self.white)
-        self.dim_lblRect = self.dim_lbl.get_rect()
-        self.dim_lblRect.center = (SCREEN_WIDTH - 98, 670)
+        self.dim_lbl = Label(self.label_font, self.white, 'Board Size:', center=(SCREEN_WIDTH - 98, 670))
+        self.dim = Label(self.label_font, self.white, self.dimensions(), center=(SCREEN_WIDTH - 98, 690))
 
-        self.dim = self.label_font.render('{} x {}'.format(int(self.players[0].board_width/64),
-                                                           int(self.players[0].board_height/64)), True, self.white)
-        self.dimRect = self.dim.get_rect()
-        self.dimRect.center = (SCREEN_WIDTH - 98, 690)
-
-        self.pattern_lbl = self.label_font.render('Wandering:', True, self.white)
-        self.pattern_lblRect = self.pattern_lbl.get_rect()
-        self.pattern_lblRect.center = (SCREEN_WIDTH - 98, 720)
-
-        self.pattern = self.label_font.render('{}'.format(self.selected_pro), True, self.white)
-        self.patternRect = self.pattern.get_rect()
-        self.patternRect.center = (SCREEN_WIDTH - 98, 740)
+        self.pattern_lbl = Label(self.label_font, self.white, 'Wandering:', center=(SCREEN_WIDTH - 98, 720))
+        self.pattern = Label(self.label_font, self.white, self.selected_pro, center=(SCREEN_WIDTH - 98, 740))
 
         self.game_over = False  # level will set this to true when all the players are together
-
-    # reset game time, dimensions, and the movement protocol
+        self.changed = []  # the parts of the screen that changed on the last call to display, as rects
+        self.pending = []  # parts of the screen that changed between frames, like when the level is reset
+
+    # where each player's picture goes. up to four players get a row each, the way the overlay was first laid out, and
+    # bigger groups are packed into two columns of smaller pictures with just their move count next to them
+    def layout(self):
+        self.icons = []
+        self.iconRects = []
+
+        if self.playerNum <= 4:
+            for index in range(self.playerNum):
+                icon = self.players_surf[self.p_names[index]]
+                self.icons.append(icon)
+                self.iconRects.append(icon.get_rect(midright=OVERLAY_POSITIONS['player{}'.format(index + 1)]))
+            return
+
+        rows = (self.playerNum + 1) // 2
+        row_height = min(40, 500 // rows)  # the rows fit between the speed control and the seed
+        icons = {name: pygame.transform.smoothscale(surf, (row_height - 4, row_height - 4)) for name, surf in
+                 self.players_surf.items()}
+        for index in range(self.playerNum):
+            icon = icons[self.p_names[index]]
+            self.icons.append(icon)
+            self.iconRects.append(icon.get_rect(topleft=(SCREEN_WIDTH - 182 + 92 * (index % 2),
+                                                         140 + row_height * (index // 2))))
+
+    # where a player's move counter goes: under the picture for up to four players, otherwise to the right of it
+    def moves_anchor(self, index):
+        if self.playerNum <= 4:
+            return {'center': (SCREEN_WIDTH - 98, 235 + 120 * index)}
+        return {'midleft': (self.iconRects[index].right + 8, self.iconRects[index].centery)}
+
+    # the game time as shown on the timer
+    def clock(self):
+        return '{}'.format(datetime.timedelta(seconds=round(self.game_time)))
+
+    # the board size as shown on the overlay
+    def dimensions(self):
+        return '{} x {}'.format(int(self.players[0].board_width / 64), int(self.players[0].board_height / 64))
+
+    # the speed as shown on the overlay, or roughly how fast the game really goes when it can't keep up
+    def speed_text(self):
+        if self.effective_speed is not None:
+            return '~{:g}x'.format(round(self.effective_speed, 1 if self.effective_speed < 10 else None))
+        return '{:g}x'.format(self.speed)
+
+    # show a new speed, or the speed the game really goes at when it falls behind it
+    def set_speed(self, speed, effective_speed=None):
+        self.speed = speed
+        self.effective_speed = effective_speed
+        self.pending.append(self.speed_control.set('speed', self.speed_text()))
+
+    # the speed control button the event pressed ('slower' or 'faster'), or None
+    def press(self, event):
+        return self.speed_control.press(event)
+
+    # the seed as shown on the overlay
+    def seed_text(self):
+        return 'Seed: {}'.format(self.seed) if self.seed is not None else ''
+
+    # seconds until the timer shows the next second, or None while it is stopped
+    def next_change(self):
+        if self.game_over or not self.players[0].all_placed:
+            return None
+        return math.floor(self.game_time + 0.5) + 0.5 - self.game_time
+
+    # reset game time, dimensions, the movement protocol, and the seed
     def reset(self):
         self.game_time = 0
-
-        self.dim = self.label_font.render('{} x {}'.format(int(self.players[0].board_width / 64),
-                                                           int(self.players[0].board_height / 64)), True, self.white)
-        self.dimRect = self.dim.get_rect()
-        self.dimRect.center = (SCREEN_WIDTH - 98, 690)
-
-        self.pattern = self.label_font.render('{}'.format(self.selected_pro), True, self.white)
-        self.patternRect = self.pattern.get_rect()
-        self.patternRect.center = (SCREEN_WIDTH - 98, 740)
-
-    # continuously displays all the components while the game is active
-    def display(self, dt):
+        self.pending += [self.dim.set(self.dimensions()), self.pattern.set(self.selected_pro),
+                         self.seed_lbl.set(self.seed_text())]
+
+    # continuously displays all the components while the game is active, with the timer showing the simulated time
+    # the level passes in (the timer stops once the game is over)
+    # the labels that changed since the last frame are kept in self.changed (and returned), so the level knows which
+    # parts of the panel need updating on the screen. when the level passes the background it drew the panel on, only
+    # those parts are cleared and drawn again; otherwise the whole panel is drawn
+    def display(self, game_time, background=None):
         # update time
-        if not self.game_over and self.players[0].all_placed:
-            self.game_time += dt
-
+        if not self.game_over:
+            self.game_time = game_time
+
+        changed = self.pending + [self.time.set(self.clock())]
+        changed += [moves.set(player.moves) for moves, player in zip(self.moves, self.players)]
+        self.changed = [rect for rect in changed if rect is not None]
+        self.pending = []
+
+        if background is None:
+            self.draw()
+        else:
+            for rect in self.changed:
+                self.display_surface.set_clip(rect)
+                self.display_surface.blit(background, rect, rect)
+                self.draw()
+            self.display_surface.set_clip(None)
+
+        return self.changed
+
+    # draw every component of the panel
+    def draw(self):
         # time
-        self.display_surface.blit(self.time_lbl, self.time_lblRect)
+        self.time_lbl.draw(self.display_surface)
+        self.time.draw(self.display_surface)
 
-        self.time = self.time_font.render('{}'.format(datetime.timedelta(seconds=round(self.game_time))), True,
-                                          self.white)
-        self.timeRect = self.time.get_rect()
-        self.timeRect.center = (SCREEN_WIDTH - 98, 60)
-        self.display_surface.blit(self.time, self.timeRect)
+        # speed
+        self.speed_lbl.draw(self.display_surface)
+        self.speed_control.draw(self.display_surface)
 
         # players
-        player1_surf = self.players_surf['player1']
-        player1_rect = player1_surf.get_rect(midright=OVERLAY_POSITIONS['player1'])
-        self.display_surface.blit(player1_surf, player1_rect)
-
-        player2_surf = self.players_surf['player2']
-        player2_rect = player2_surf.get_rect(midright=OVERLAY_POSITIONS['player2'])
-        self.display_surface.blit(player2_surf, player2_rect)
-
-        self.display_surface.blit(self.p1_moves_lbl, self.p1_moves_lblRect)
-
-        self.p1_moves = self.label_font.render('{}'.format(self.players[0].moves), True, self.white)
-        self.p1_movesRect = self.p1_moves.get_rect()
-        self.p1_movesRect.center = (SCREEN_WIDTH - 98, 235)
-        self.display_surface.blit(self.p1_moves, self.p1_movesRect)
-
-        self.display_surface.blit(self.p2_moves_lbl, self.p2_moves_lblRect)
-
-        self.p2_moves = self.label_font.render('{}'.format(self.players[1].moves), True, self.white)
-        self.p2_movesRect = self.p2_moves.get_rect()
-        self.p2_movesRect.center = (SCREEN_WIDTH - 98, 355)
-        self.display_surface.blit(self.p2_moves, self.p2_movesRect)
-
-        if self.playerNum >= 3:
-            player3_surf = self.players_surf['player3']
-            player3_rect = player3_surf.get_rect(midright=OVERLAY_POSITIONS['player3'])
-            self.display_surface.blit(player3_surf, player3_rect)
-
-            self.display_surface.blit(self.p3_moves_lbl, self.p3_moves_lblRect)
-
-            self.p3_moves = self.label_font.render('{}'.format(self.players[2].moves), True, self.white)
-            self.p3_movesRect = self.p3_moves.get_rect()
-            self.p3_movesRect.center = (SCREEN_WIDTH - 98, 475)
-            self.display_surface.blit(self.p3_moves, self.p3_movesRect)
-
-        if self.playerNum == 4:
-            player4_surf = self.players_surf['player4']
-            player4_rect = player4_surf.get_rect(midright=OVERLAY_POSITIONS['player4'])
-            self.display_surface.blit(player4_surf, player4_rect)
-
-            self.display_surface.blit(self.p4_moves_lbl, self.p4_moves_lblRect)
+        for index in range(self.playerNum):
+            self.display_surface.blit(self.icons[index], self.iconRects[index])
+            if self.moves_lbls:
+                self.moves_lbls[index].draw(self.display_surface)
+            self.moves[index].draw(self.display_surface)
 
-            self.p4_moves = self.label_font.render('{}'.format(self.players[3].moves), True, self.white)
-            self.p4_movesRect = self.p4_moves.get_rect()
-            self.p4_movesRect.center = (SCREEN_WIDTH - 98, 595)
-            self.display_surface.blit(self.p4_moves, self.p4_movesRect)
+        # seed
+        self.seed_lbl.draw(self.display_surface)
 
         # dimensions
-        self.display_surface.blit(self.dim_lbl, self.dim_lblRect)
-        self.display_surface.blit(self.dim, self.dimRect)
+        self.dim_lbl.draw(self.display_surface)
+        self.dim.draw(self.display_surface)
 
         # movement protocol
-        self.display_surface.blit(self.pattern_lbl, self.pattern_lblRect)
-        self.display_surface.blit(self.pattern, self.patternRect)
+        self.pattern_lbl.draw(self.display_surface)
+        self.pattern.draw(self.display_surface)
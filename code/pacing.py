@@ -0,0 +1,56 @@
+# file: pacing.py
+# purpose: decides when the next frame is drawn. frames are capped at a target rate, the game sleeps while nothing on
+#          the screen is changing until the next thing is due or the user does something, and everything stops while
+#          the window is in the background or minimized
+
+import math
+
+import pygame
+from settings import *
+
+PAUSE_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN)  # the window went away
+RESUME_EVENTS = (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)  # the window came back
+
+
+class FramePacer:
+    def __init__(self, fps=TARGET_FPS, pause_unfocused=PAUSE_UNFOCUSED):
+        self.clock = pygame.time.Clock()
+        self.fps = fps  # the most frames drawn per second; 0 means as many as possible
+        self.pause_unfocused = pause_unfocused  # stop everything while the window is in the background
+        self.paused = False  # true while the window is in the background or minimized
+        self.resumed = False  # true when the window just came back, so the time away isn't counted as game time
+
+    # the events that came in since the last frame. when nothing will change for longer than a frame, this sleeps until
+    # `wait` seconds have passed or an event comes in, whichever is first (wait=None sleeps until an event). while the
+    # window is paused this sleeps until it comes back, keeping only events that quit the game
+    def events(self, wait):
+        if wait is None:
+            event_list = [pygame.event.wait()] + pygame.event.get()
+        elif self.fps and wait > 1 / self.fps:
+            event = pygame.event.wait(math.ceil(wait * 1000))
+            event_list = ([event] if event.type != pygame.NOEVENT else []) + pygame.event.get()
+        else:
+            event_list = pygame.event.get()
+
+        kept = []
+        while True:
+            for event in event_list:
+                if self.pause_unfocused and event.type in PAUSE_EVENTS:
+                    self.paused = True
+                elif event.type in RESUME_EVENTS and self.paused:
+                    self.paused = False
+                    self.resumed = True
+                elif not self.paused or event.type == pygame.QUIT:
+                    kept.append(event)
+
+            if not self.paused or any(event.type == pygame.QUIT for event in kept):
+                return kept
+            event_list = [pygame.event.wait()] + pygame.event.get()
+
+    # wait out the rest of the frame and return the seconds since the last one (delta time)
+    def tick(self):
+        dt = self.clock.tick(self.fps) / 1000
+        if self.resumed:  # nothing moves while the game was paused
+            self.resumed = False
+            return 0
+        return dt
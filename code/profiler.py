@@ -0,0 +1,169 @@
+# file: profiler.py
+# purpose: times the parts of every frame (handling events, updating the level, drawing the woods and the players, the
+#          overlay, the menu, and sending the frame to the display) into a fixed-size ring buffer, so stutter can be
+#          tracked down on any computer without an outside profiler. the timings can be shown on the screen, and saved
+#          as a chrome trace_event file for chrome://tracing or Perfetto. while it is turned off, timing a part of a
+#          frame does nothing at all
+
+import array
+import contextlib
+import datetime
+import json
+import os
+import time
+
+import pygame
+from settings import *
+from labels import load_font
+from support import asset_path
+
+# the parts of a frame that are timed, in the order they are shown on the screen
+PHASES = ['frame', 'events', 'level.update', 'level.input', 'sprites.update', 'render_grid', 'sprites.draw',
+          'overlay.display', 'menu.update', 'display.update']
+SMOOTHING = 0.1  # how much each new frame moves the averages shown on the screen
+HUD_REFRESH = 0.25  # seconds between the numbers on the screen being rendered again
+PROFILE_FOLDER = asset_path('profiles')  # where traces are saved
+
+NO_PHASE = contextlib.nullcontext()  # what timing a phase gives back while the profiler is turned off
+
+
+# times one part of a frame for the profiler, as a with block
+class Phase:
+    def __init__(self, profiler, index):
+        self.profiler = profiler
+        self.index = index  # where the phase's name is in the profiler's names
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exception):
+        self.profiler.record(self.index, self.start, time.perf_counter())
+
+
+class Profiler:
+    def __init__(self, size=PROFILE_BUFFER, enabled=PROFILE):
+        self.enabled = enabled
+        self.size = size  # how many timings are kept; once it is full the oldest ones are overwritten
+
+        self.names = []  # phase names, in the order they were first timed
+        self.phases = {}  # name -> the Phase that times it
+        for name in PHASES:
+            self.add(name)
+
+        # the ring buffer: which phase each timing is for, and when it started and ended
+        self.kinds = array.array('H', [0]) * size
+        self.starts = array.array('d', [0.0]) * size
+        self.ends = array.array('d', [0.0]) * size
+        self.next = 0  # where the next timing goes
+        self.count = 0  # how many timings are kept
+
+        self.frame_start = None  # when the frame being timed started
+        self.totals = [0.0] * len(self.names)  # seconds spent in each phase so far this frame
+        self.averages = [0.0] * len(self.names)  # milliseconds spent in each phase per frame, smoothed
+        self.fps = 0  # frames per second, smoothed
+
+    def add(self, name):
+        self.phases[name] = Phase(self, len(self.names))
+        self.names.append(name)
+
+    # time a part of the frame: with profiler.phase('name'): ...
+    def phase(self, name):
+        if not self.enabled:
+            return NO_PHASE
+        if name not in self.phases:
+            self.add(name)
+            self.totals.append(0.0)
+            self.averages.append(0.0)
+        return self.phases[name]
+
+    def record(self, index, start, end):
+        self.kinds[self.next] = index
+        self.starts[self.next] = start
+        self.ends[self.next] = end
+        self.next = (self.next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.totals[index] += end - start
+
+    # a new frame is starting: the one before it is timed as a whole, and added to the averages
+    def frame(self):
+        if not self.enabled:
+            self.frame_start = None
+            return
+
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.record(0, self.frame_start, now)
+            self.averages = [average + (total * 1000 - average) * SMOOTHING for average, total in
+                             zip(self.averages, self.totals)]
+            self.fps += (1 / max(now - self.frame_start, 1e-6) - self.fps) * SMOOTHING
+        self.totals = [0.0] * len(self.names)
+        self.frame_start = now
+
+    # the kept timings from oldest to newest, as (name, start, end)
+    def timings(self):
+        first = (self.next - self.count) % self.size
+        for offset in range(self.count):
+            index = (first + offset) % self.size
+            yield self.names[self.kinds[index]], self.starts[index], self.ends[index]
+
+    # the kept timings as a chrome trace_event file's contents, in microseconds from the oldest timing
+    def trace(self):
+        timings = list(self.timings())
+        origin = min((start for _, start, _ in timings), default=0)
+        events = [{'name': name, 'cat': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1, 'ts': (start - origin) * 1e6,
+                   'dur': (end - start) * 1e6} for name, start, end in timings]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    # save the trace to the profiles folder
+    # returns the path it was saved to
+    def dump(self, folder=PROFILE_FOLDER):
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, 'trace-{:%Y%m%d-%H%M%S}.json'.format(datetime.datetime.now()))
+        with open(path, 'w') as file:
+            json.dump(self.trace(), file)
+        return path
+
+
+# the frame rate and the milliseconds each part of a frame takes, in a box in the corner of the woods
+class ProfilerHUD:
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.font = load_font(14)
+        self.visible = False
+        self.lines = []  # the rendered lines of text
+        self.refresh = 0  # seconds until the lines are rendered again
+        self.rect = pygame.Rect(8, 8, 230, 12 + 18 * (len(PHASES) + 1))
+
+    # the hud only shows numbers while the profiler is on, so showing it turns the profiler on too
+    def toggle(self):
+        self.visible = not self.visible
+        self.profiler.enabled = self.visible or PROFILE
+
+    # render the names on the left and the numbers lined up on the right
+    def render(self):
+        white = (255, 255, 255)
+        rows = [('FPS', '{:.1f}'.format(self.profiler.fps))]
+        rows += [(name, '{:.2f} ms'.format(average)) for name, average in
+                 zip(self.profiler.names, self.profiler.averages)]
+        self.lines = [(self.font.render(name, True, white), self.font.render(value, True, white))
+                      for name, value in rows]
+        self.rect.height = max(self.rect.height, 12 + 18 * len(self.lines))
+
+    # draw the hud, rendering the numbers again every HUD_REFRESH seconds
+    # returns the part of the screen it covers
+    def draw(self, surface, dt):
+        self.refresh -= dt
+        if self.refresh <= 0 or not self.lines:
+            self.render()
+            self.refresh = HUD_REFRESH
+
+        pygame.draw.rect(surface, (20, 20, 20), self.rect)
+        for index, (name, value) in enumerate(self.lines):
+            top = self.rect.y + 6 + 18 * index
+            surface.blit(name, (self.rect.x + 8, top))
+            surface.blit(value, value.get_rect(topright=(self.rect.right - 8, top)))
+        return self.rect.copy()
+
+
+profiler = Profiler()  # the one profiler every part of the game times itself with
@@ -0,0 +1,217 @@
+# file: replay.py
+# purpose: records every game as a small replay log: the seed, the level settings, the cells the players started in,
+#          and the direction of every move, packed four moves to a byte. a log can be loaded again and played back
+#          through the level, so an interesting or odd game can be watched again without a screen recording. every
+#          KEYFRAME_INTERVAL steps the whole state of the game is saved as a keyframe too, so playing back can jump to
+#          any step by picking up from the keyframe before it instead of playing every step from the start
+
+import datetime
+import os
+import struct
+
+from simulation import PROTOCOLS, OFFSETS
+from support import asset_path
+
+MAGIC = b'WWRP'  # the first bytes of a replay log
+VERSION = 2  # version 1 logs have no keyframes, and can still be played back
+HEADER = '<4sBQHHBBH'  # magic, version, seed, grid width, grid height, protocol, level, number of players
+PLAYER = '<HHB'  # a player's starting column and row, and their first 'every other' turn
+COUNTS = '<II'  # steps taken, and moves made over all those steps
+KEYFRAMES = '<IH'  # the amount of keyframes, and the steps between them
+INDEX_ENTRY = '<III'  # a keyframe's step, the moves made by then, and where in the log the keyframe is
+WALKER_STATE = '<HHBBIHI'  # a walker's cell, last direction, turn and found and lead flags, moves, group leader, and
+                           # how many random numbers their stream has given
+NO_DIRECTION = 255  # the direction of a walker that hasn't moved yet
+KEYFRAME_INTERVAL = 256  # steps between two keyframes
+REPLAY_FOLDER = asset_path('replays')  # where finished games are saved
+
+
+# pack direction codes (0 to 3) four to a byte, the first code in the lowest two bits
+def pack_directions(directions):
+    packed = bytearray((len(directions) + 3) // 4)
+    for index, direction in enumerate(directions):
+        packed[index >> 2] |= direction << ((index & 3) * 2)
+    return bytes(packed)
+
+
+# the first `count` direction codes packed in data
+def unpack_directions(data, count):
+    return bytearray((data[index >> 2] >> ((index & 3) * 2)) & 3 for index in range(count))
+
+
+# a simulation state (see Simulation.state) as the bytes of a keyframe
+def pack_state(state):
+    steps, walkers, positions = state
+    data = []
+    for index, (x, y, direction, turn, found, lead, moves, leader) in enumerate(walkers):
+        direction = NO_DIRECTION if direction is None else direction
+        flags = turn | found << 1 | lead << 2
+        position = positions[index] if index < len(positions) else 0
+        data.append(struct.pack(WALKER_STATE, x, y, direction, flags, moves, leader, position))
+    return b''.join(data)
+
+
+# read the state at `step` of `count` walkers back from the keyframe at offset in data
+def unpack_state(data, offset, step, count):
+    walkers, positions = [], []
+    for x, y, direction, flags, moves, leader, position in struct.iter_unpack(
+            WALKER_STATE, data[offset:offset + count * struct.calcsize(WALKER_STATE)]):
+        direction = None if direction == NO_DIRECTION else direction
+        walkers.append((x, y, direction, flags & 1, bool(flags & 2), bool(flags & 4), moves, leader))
+        positions.append(position)
+    return step, walkers, positions
+
+
+# everything needed to play a game again: the settings it was played with, where the players started, and which way
+# every group leader moved on every step
+class Recording:
+    def __init__(self, seed, width, height, protocol, level, starts, turns):
+        self.seed = seed
+        self.width = width  # grid width in cells
+        self.height = height  # grid height in cells
+        self.protocol = protocol  # one of PROTOCOLS
+        self.level = level  # 1 for K-2, 2 for 3-5, 3 for 6-8
+        self.starts = list(starts)  # (x, y) cell each player started in
+        self.turns = list(turns)  # each player's first 'every other' turn
+        self.directions = bytearray()  # the direction code of every move, in the order the simulation made them
+        self.steps = 0  # the amount of steps recorded
+        self.keyframes = []  # (step, moves made by then, state) every KEYFRAME_INTERVAL steps. a loaded recording
+                             # only reads a keyframe's state from its log when the keyframe is first needed
+        self.interval = KEYFRAME_INTERVAL
+        self.log = None  # the bytes a recording was loaded from
+
+    # record the moves the simulation's group leaders made on its last step, and a keyframe every interval steps
+    def record(self, simulation):
+        self.directions.extend(simulation.walkers[index].direction for index in simulation.moved)
+        self.steps += 1
+        if self.steps % self.interval == 0:
+            self.keyframes.append((self.steps, len(self.directions), simulation.state()))
+
+    # the last keyframe at or before a step, as (step, moves made by then, state), or None when the step comes before
+    # the first keyframe. keyframes are evenly spaced, so finding one takes the same time however long the game was.
+    # raises ValueError if the keyframe read from a log is corrupt
+    def keyframe(self, step):
+        index = min(step // self.interval, len(self.keyframes)) - 1
+        if index < 0:
+            return None
+
+        keyframe_step, played, state = self.keyframes[index]
+        if not isinstance(state, tuple):  # still just where the keyframe is in the log
+            if keyframe_step != (index + 1) * self.interval:
+                raise ValueError('keyframe {} of the replay log is corrupt'.format(index))
+            state = unpack_state(self.log, state, keyframe_step, len(self.starts))
+            if not self.valid(state):
+                raise ValueError('keyframe {} of the replay log is corrupt'.format(index))
+            self.keyframes[index] = (keyframe_step, played, state)
+        return self.keyframes[index]
+
+    # True when every walker in a keyframe's state is in a cell on the grid, faces a direction there is (or none yet),
+    # and follows one of the players
+    def valid(self, state):
+        _, walkers, _ = state
+        return all(x < self.width and y < self.height and (direction is None or direction < len(OFFSETS)) and
+                   leader < len(self.starts) for x, y, direction, _, _, _, _, leader in walkers)
+
+    # the recording as the bytes of a replay log
+    def pack(self):
+        data = [struct.pack(HEADER, MAGIC, VERSION, self.seed, self.width, self.height,
+                            PROTOCOLS.index(self.protocol), self.level, len(self.starts))]
+        data += [struct.pack(PLAYER, x, y, turn) for (x, y), turn in zip(self.starts, self.turns)]
+        data.append(struct.pack(COUNTS, self.steps, len(self.directions)))
+        data.append(pack_directions(self.directions))
+
+        # the keyframe index, and then the keyframes it points to
+        keyframes = [pack_state(self.keyframe(step)[2]) for step, _, _ in self.keyframes]
+        data.append(struct.pack(KEYFRAMES, len(keyframes), self.interval))
+        offset = sum(len(part) for part in data) + len(keyframes) * struct.calcsize(INDEX_ENTRY)
+        for (step, played, _), keyframe in zip(self.keyframes, keyframes):
+            data.append(struct.pack(INDEX_ENTRY, step, played, offset))
+            offset += len(keyframe)
+        data += keyframes
+        return b''.join(data)
+
+
+# read a recording back from the bytes of a replay log; raises ValueError if data isn't a replay log, including one
+# that was cut short or has settings the game doesn't know
+def unpack(data):
+    if len(data) < struct.calcsize(HEADER) or data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not a replay log')
+    magic, version, seed, width, height, protocol, level, player_num = struct.unpack_from(HEADER, data)
+    if version not in (1, VERSION):
+        raise ValueError('replay log version {} is not supported'.format(version))
+    try:
+        return unpack_recording(data, version, seed, width, height, protocol, level, player_num)
+    except (struct.error, IndexError):
+        raise ValueError('not a replay log') from None
+
+
+# the recording in a replay log after its header
+def unpack_recording(data, version, seed, width, height, protocol, level, player_num):
+    if protocol >= len(PROTOCOLS) or level not in (1, 2, 3) or not width or not height or not player_num:
+        raise ValueError('not a replay log')
+
+    offset = struct.calcsize(HEADER)
+    starts, turns = [], []
+    for _ in range(player_num):
+        x, y, turn = struct.unpack_from(PLAYER, data, offset)
+        if x >= width or y >= height or turn > 1:
+            raise ValueError('not a replay log')
+        starts.append((x, y))
+        turns.append(turn)
+        offset += struct.calcsize(PLAYER)
+
+    steps, moves = struct.unpack_from(COUNTS, data, offset)
+    offset += struct.calcsize(COUNTS)
+    if len(data) < offset + (moves + 3) // 4:
+        raise ValueError('not a replay log')
+
+    recording = Recording(seed, width, height, PROTOCOLS[protocol], level, starts, turns)
+    recording.steps = steps
+    recording.directions = unpack_directions(data[offset:], moves)
+    recording.log = data
+    if version == 1:
+        return recording
+
+    # only the index is read now; each keyframe is read when it is first needed, so where they are is checked here
+    offset += (moves + 3) // 4
+    count, recording.interval = struct.unpack_from(KEYFRAMES, data, offset)
+    offset += struct.calcsize(KEYFRAMES)
+    recording.keyframes = [entry for entry in struct.iter_unpack(
+        INDEX_ENTRY, data[offset:offset + count * struct.calcsize(INDEX_ENTRY)])]
+    size = player_num * struct.calcsize(WALKER_STATE)
+    if not recording.interval or len(recording.keyframes) != count or any(
+            played > moves or start + size > len(data) for _, played, start in recording.keyframes):
+        raise ValueError('not a replay log')
+    return recording
+
+
+# move a simulation that is playing back a recording to a step. it picks up from the last keyframe before the step
+# (or from the start when there isn't one) and plays the recorded moves from there, unless the simulation is already
+# between that keyframe and the step and can just play on
+def seek(simulation, recording, step):
+    step = max(0, min(step, recording.steps))
+    keyframe = recording.keyframe(step)
+    start = keyframe[0] if keyframe is not None else 0
+    if not start <= simulation.steps <= step:
+        if keyframe is None:
+            simulation.reset()
+        else:
+            simulation.restore(keyframe[2], keyframe[1])
+    while simulation.steps < step and not simulation.over:
+        simulation.step()
+
+
+# save a recording to the replay folder, named after when it was saved and its seed
+# returns the path it was saved to
+def save(recording, folder=REPLAY_FOLDER):
+    os.makedirs(folder, exist_ok=True)
+    name = '{:%Y%m%d-%H%M%S}-{}.replay'.format(datetime.datetime.now(), recording.seed)
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as file:
+        file.write(recording.pack())
+    return path
+
+
+def load(path):
+    with open(path, 'rb') as file:
+        return unpack(file.read())
@@ -0,0 +1,40 @@
+# file: schedule.py
+# purpose: keeps the things that will happen in the level at a known game time in a heap, soonest first: the next
+#          simulation step, where every group leader decides which way to go, and each player finishing their slide into
+#          the cell they were moved to. the level only handles the events that are due each frame, however many players
+#          there are, and the soonest one tells the frame pacer how long the game can sleep
+
+import heapq
+import itertools
+
+STEP = 'step'  # the simulation takes a step
+ARRIVE = 'arrive'  # a player finishes sliding into their cell
+
+
+class Scheduler:
+    def __init__(self):
+        self.events = []  # the heap of (game time, order added, kind, player index)
+        self.order = itertools.count()  # events due at the same time come out in the order they were added
+
+    # add an event of a kind (STEP or ARRIVE) due at a game time, for a player (ARRIVE) or for everyone (STEP)
+    def add(self, time, kind, index=None):
+        heapq.heappush(self.events, (time, next(self.order), kind, index))
+
+    # the game time the soonest event is due, or None when nothing is scheduled
+    def next_time(self):
+        return self.events[0][0] if self.events else None
+
+    # take the events due by a game time off the heap, soonest first, as (game time, kind, player index). events added
+    # while going through them come out too if they are due
+    def due(self, now):
+        while self.events and self.events[0][0] <= now:
+            time, _, kind, index = heapq.heappop(self.events)
+            yield time, kind, index
+
+    # drop every event, like when the game starts over or a replay jumps to another step
+    def clear(self):
+        self.events = []
+
+    # True while any event is scheduled
+    def __bool__(self):
+        return bool(self.events)
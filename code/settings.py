@@ -5,6 +5,50 @@
 SCREEN_WIDTH = 960
 SCREEN_HEIGHT = 769
 TILE_SIZE = 64
+TARGET_FPS = 60  # the most frames drawn per second; the game draws fewer while nothing is moving
+VSYNC = False  # wait for the monitor to refresh before showing a frame (needs a scaled window, so it's off by default)
+PAUSE_UNFOCUSED = True  # stop the game and stop drawing while the window is in the background or minimized
+DIRTY_RECTS = True  # only send the parts of the screen that changed to the display, instead of the whole frame
+PLAY_SIZE = 768  # width and height of the play area the woods are drawn in, left of the overlay
+STARTUP_BUDGET = 1.0  # seconds the game has to show the title screen; the startup report is printed if it takes longer
+STARTUP_REPORT = False  # always print how long each part of starting the game took
+
+# profiling
+PROFILE = False  # time the parts of every frame from the start, instead of only once the hud is turned on
+PROFILE_BUFFER = 8192  # how many timings the profiler keeps; the oldest ones are overwritten
+PROFILE_HUD_KEY = 'f3'  # shows or hides the frame rate and how long each part of a frame takes
+PROFILE_TRACE_KEY = 'f4'  # saves the kept timings to the profiles folder, to open in chrome://tracing or Perfetto
+
+# random numbers
+SEED = None  # seed for the first game's random numbers, like one shown in the overlay; None picks a new one every time
+
+# game speed
+SPEEDS = [0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]  # the speeds the overlay's speed control steps through
+DISCRETE_SPEED = 25  # from this speed on, players jump from cell to cell instead of sliding
+STEP_BUDGET = 0.008  # seconds of a frame the simulation can spend taking steps; the steps it can't get to are taken on
+                     # the frames after, so a sped up game falls behind instead of the game freezing up
+STEP_BACKLOG = 1  # seconds (at the game's speed) the simulation can fall behind; past that the game time is dropped, and
+                  # the speed control shows the speed the game really goes at instead
+SPEED_WINDOW = 1  # seconds the speed the game really goes at is measured over
+
+# replays
+RECORD_REPLAYS = True  # save every finished game to the replays folder, so it can be watched again with --replay
+
+# grid sizes
+MAX_GRID_SIZE = 12  # the biggest grid that fits the play area at full size
+LARGE_GRID_SIZES = [16, 32, 64, 128, 256, 512, 1024, 2048, 4096]  # bigger grids, viewed through the camera
+
+# camera
+ZOOM_STEP = 1.25  # how much one notch of the mouse wheel zooms in or out
+SCROLL_SPEED = 600  # screen pixels per second the view scrolls while w/a/s/d are held
+LOD_CELL_SIZE = 16  # below this many pixels per cell, players are drawn as blocks instead of sprites
+
+# players
+MAX_PLAYERS = 30  # the most players the menu lets students lose in the woods at once
+SLIDE_SPEED = 200  # pixels per second players slide from one cell to the next
+
+# colors players are drawn in when zoomed too far out to see their sprites
+PLAYER_COLORS = [(240, 225, 140), (240, 160, 70), (110, 210, 200), (150, 210, 110)]
 
 # overlay positions 
 OVERLAY_POSITIONS = {
@@ -0,0 +1,306 @@
+# file: simulation.py
+# purpose: headless simulation core that runs the wandering protocols and the meeting/lead rules on an integer grid,
+#          one discrete step at a time, without pygame, sprites, or timers
+
+import random
+
+import streams
+from groups import Groups
+from occupancy import Occupancy
+
+# direction codes picked by the wandering protocols
+UP = 0
+DOWN = 1
+RIGHT = 2
+LEFT = 3
+
+# how far a player moves on the grid for each direction code, as (x, y) cells
+OFFSETS = {UP: (0, -1), DOWN: (0, 1), RIGHT: (1, 0), LEFT: (-1, 0)}
+
+# sprite status names for each direction code, used when the level animates a step
+STATUSES = {UP: 'up', DOWN: 'down', RIGHT: 'right', LEFT: 'left'}
+
+PROTOCOLS = ['random', 'every other']  # the wandering protocols the simulation knows how to run
+STEP_TIME = 2  # seconds of game time between two steps
+
+
+# the cells players start in when they are not placed by the user: the four corners of the grid, and then any players
+# past the fourth spread out evenly over the rest of the grid (sharing cells once the grid is full)
+def default_starts(width, height, count=4):
+    corners = [(0, 0), (width - 1, height - 1), (width - 1, 0), (0, height - 1)]
+    starts = corners[:count]
+
+    # the other cells are numbered row by row, skipping the corners, without listing them so huge grids stay cheap
+    extra = count - len(starts)
+    others = width * height - len(corners)
+    if extra > 0 and others <= 0:  # a 2 x 2 grid is all corners
+        starts += [corners[index % len(corners)] for index in range(extra)]
+    elif extra > 0:
+        skipped = sorted(y * width + x for x, y in corners)
+        for index in range(extra):
+            cell = index * others // extra
+            for corner in skipped:
+                if cell >= corner:
+                    cell += 1
+            starts.append((cell % width, cell // width))
+    return starts
+
+
+# 'random' protocol
+# a random number 0,3 is picked and the player moves up, down, right, or left, bouncing off the grid's edges
+def random_direction(walker, width, height, rng):
+    rand = rng.randint(0, 3)
+
+    if rand == UP:
+        return DOWN if walker.y == 0 else UP
+    if rand == DOWN:
+        return UP if walker.y == height - 1 else DOWN
+    if rand == RIGHT:
+        return LEFT if walker.x == width - 1 else RIGHT
+    return RIGHT if walker.x == 0 else LEFT
+
+
+# 'every other' protocol
+# when the turn is 0 the player only moves vertically and when the turn is 1 only horizontally, with a random number
+# 0 or 1 picking up/right or down/left, again bouncing off the grid's edges. the turn alternates after every step
+def every_other_direction(walker, width, height, rng):
+    rand = rng.randint(0, 1)
+
+    if walker.turn == 0:
+        walker.turn = 1
+        if rand == 0:
+            return DOWN if walker.y == 0 else UP
+        return UP if walker.y == height - 1 else DOWN
+
+    walker.turn = 0
+    if rand == 0:
+        return LEFT if walker.x == width - 1 else RIGHT
+    return RIGHT if walker.x == 0 else LEFT
+
+
+PROTOCOL_DIRECTIONS = {'random': random_direction, 'every other': every_other_direction}
+
+
+# the grid state of a single player. once a walker follows another group leader, its own cell and direction are no
+# longer updated; Simulation.cell and Simulation.facing give every walker's position through their group's leader
+class Walker:
+    def __init__(self, x, y, turn=0):
+        # the cell and 'every other' turn the walker goes back to on a reset
+        self.start_x = x
+        self.start_y = y
+        self.start_turn = turn
+
+        self.reset()
+
+    # put the walker back in its starting cell with its statistics cleared
+    def reset(self):
+        self.x = self.start_x  # current column on the grid
+        self.y = self.start_y  # current row on the grid
+        self.turn = self.start_turn  # 0 for a vertical step next, 1 for a horizontal step next ('every other' only)
+        self.direction = None  # direction code of the last step, None until the walker has moved
+
+        self.moves = 0  # the amount of moves the walker made before meeting another walker
+        self.found = False  # True when the walker has found at least one other walker
+        self.lead = False  # True when the walker leads a group of found walkers
+
+
+# the woods: a grid of walkers that take one step at a time until they have all found each other
+class Simulation:
+    def __init__(self, width, height, protocol='random', starts=None, turns=None, rng=None, vision=0, seed=None,
+                 directions=None):
+        self.width = width  # grid width in cells
+        self.height = height  # grid height in cells
+        self.protocol = protocol  # one of PROTOCOLS
+        self.vision = vision  # how many cells away walkers can see each other; 0 means they have to share a cell
+
+        if starts is None:
+            starts = default_starts(width, height)[:2]
+        if turns is None:
+            turns = [index % 2 for index in range(len(starts))]  # players alternate starting turns like the level
+        self.walkers = [Walker(x, y, turn) for (x, y), turn in zip(starts, turns)]
+
+        # every walker draws from their own stream spawned from the seed, unless they are all given one rng to share
+        # (anything with a randint method)
+        self.seed = seed if seed is not None else random.randrange(1_000_000_000)
+        self.streams = streams.spawn(self.seed, len(self.walkers)) if rng is None else []
+        self.rngs = self.streams if rng is None else [rng] * len(self.walkers)
+
+        # the direction codes of a recorded game, when playing one back: the group leaders make the recorded moves,
+        # in order, instead of picking them with the protocol
+        self.directions = directions
+
+        self.reset()
+
+    # put every walker back at the start, with their random numbers starting over too, so the same game is played again
+    def reset(self):
+        for stream in self.streams:
+            stream.reset()
+        self.groups = Groups(len(self.walkers))  # which walkers have found each other
+        self.leaders = list(range(len(self.walkers)))  # the walker leading each group, lowest numbered first
+        self.occupancy = Occupancy()  # which group leaders stand in which cell
+        for index, walker in enumerate(self.walkers):
+            walker.reset()
+            self.occupancy.add(index, (walker.x, walker.y))
+
+        self.steps = 0  # the amount of steps taken so far
+        self.over = False  # True once every walker has found every other walker
+        self.meetings = []  # (leader, follower) pairs of group leaders that met during the last step
+        self.moved = []  # the group leaders that moved during the last step, in the order they moved
+        self.playback = iter(self.directions) if self.directions is not None else None  # the recorded moves left
+
+        # walkers placed in the same cell have found each other straight away
+        self.check_meetings(None, list(self.leaders))
+
+    # everything needed to pick the game up again from the current step, for the keyframes of a replay: the step, each
+    # walker's cell, last direction, turn, found and lead flags, moves, and group leader, and how far along each stream
+    # of random numbers is
+    def state(self):
+        walkers = [(walker.x, walker.y, walker.direction, walker.turn, walker.found, walker.lead, walker.moves,
+                    self.groups.find(index)) for index, walker in enumerate(self.walkers)]
+        return self.steps, walkers, [stream.position() for stream in self.streams]
+
+    # pick the game up again from a state. `played` is how many recorded moves had been made by then, when a game is
+    # being played back
+    def restore(self, state, played=0):
+        steps, walkers, positions = state
+        for stream, position in zip(self.streams, positions):
+            stream.seek(position)
+
+        self.groups = Groups(len(self.walkers))
+        for index, (walker, (x, y, direction, turn, found, lead, moves, leader)) in enumerate(zip(self.walkers,
+                                                                                              walkers)):
+            walker.x, walker.y, walker.direction, walker.turn = x, y, direction, turn
+            walker.found, walker.lead, walker.moves = found, lead, moves
+            if leader != index:
+                self.groups.union(leader, index)
+
+        self.leaders = [index for index in range(len(self.walkers)) if self.groups.find(index) == index]
+        self.occupancy = Occupancy()
+        for index in self.leaders:
+            self.occupancy.add(index, (self.walkers[index].x, self.walkers[index].y))
+
+        self.steps = steps
+        self.over = len(self.leaders) == 1
+        self.meetings = []
+        self.moved = []
+        self.playback = iter(self.directions[played:]) if self.directions is not None else None
+
+    # game time that has passed in the simulation
+    def time(self):
+        return self.steps * STEP_TIME
+
+    # the walker that moves a walker's group
+    def leader_of(self, index):
+        return self.groups.find(index)
+
+    # the cell a walker is in, which is always their group leader's cell
+    def cell(self, index):
+        leader = self.walkers[self.groups.find(index)]
+        return leader.x, leader.y
+
+    # the direction code of a walker's last step, which is always their group leader's last step
+    def facing(self, index):
+        return self.walkers[self.groups.find(index)].direction
+
+    # advance the simulation by one step: every group leader (or lone walker) picks a direction with the selected
+    # protocol and moves one cell, taking their whole group with them, and then meetings are checked
+    # returns True once the game is over
+    def step(self):
+        if self.over:
+            return True
+
+        choose_direction = PROTOCOL_DIRECTIONS[self.protocol]
+        previous = {}
+        moved = list(self.leaders)
+
+        for index in moved:
+            walker = self.walkers[index]
+            previous[index] = (walker.x, walker.y)
+            walker.direction = self.next_direction(walker, index, choose_direction)
+            dx, dy = OFFSETS[walker.direction]
+            walker.x += dx
+            walker.y += dy
+            self.occupancy.move(index, previous[index], (walker.x, walker.y))
+
+        self.steps += 1
+        self.moved = moved
+        self.check_meetings(previous, moved)
+
+        # a step only counts for walkers that were still lost at the end of it
+        for index in moved:
+            walker = self.walkers[index]
+            if not walker.found:
+                walker.moves += 1
+
+        return self.over
+
+    # the direction a group leader moves in next: the next recorded move when a game is being played back, otherwise
+    # the protocol's pick. a recorded 'every other' move still takes the walker's turn. once the recorded moves run out
+    # the protocol takes over again
+    def next_direction(self, walker, index, choose_direction):
+        if self.playback is not None:
+            direction = next(self.playback, None)
+            if direction is not None:
+                if self.protocol == 'every other':
+                    walker.turn = 1 - walker.turn
+                return direction
+            self.playback = None
+        return choose_direction(walker, self.width, self.height, self.rngs[index])
+
+    # keep going until everyone is found, or until max_steps have been taken
+    # returns the amount of steps taken
+    def run(self, max_steps=None):
+        while not self.over and (max_steps is None or self.steps < max_steps):
+            self.step()
+        return self.steps
+
+    # the walkers within `distance` cells of a walker, not counting the walker's own group
+    def nearby(self, index, distance):
+        leader = self.groups.find(index)
+        walker = self.walkers[leader]
+        return [member for other in self.occupancy.within((walker.x, walker.y), distance) if other != leader
+                for member in self.groups.members[other]]
+
+    # two groups meet when they end a step within sight of each other (in the same cell unless the simulation has a
+    # vision range) or when they swap cells and pass each other on the way. only the groups that moved need checking,
+    # and only against the groups in the cells around them. every meeting is found before any groups are merged, so
+    # the order groups are checked in doesn't matter. the game is over once only one group is left
+    def check_meetings(self, previous, moved):
+        self.meetings = []
+
+        met = []
+        for index in moved:
+            walker = self.walkers[index]
+            cell = (walker.x, walker.y)
+            met.extend((index, other) for other in self.occupancy.within(cell, self.vision) if other != index)
+
+            if previous is not None:
+                met.extend((index, other) for other in self.occupancy.at(previous[index])
+                           if previous.get(other) == cell)
+
+        for first, second in met:
+            self.meet(first, second)
+
+        if len(self.leaders) == 1:
+            self.over = True
+            for walker in self.walkers:
+                walker.lead = False
+
+    # group leaders i and j have found each other, so merge their groups; the merged group stands wherever the lower
+    # numbered leader is
+    def meet(self, i, j):
+        self.walkers[i].found = True
+        self.walkers[j].found = True
+
+        merged = self.groups.union(i, j)
+        if merged is None:
+            return
+
+        leader, follower = merged
+        following = self.walkers[follower]
+        self.occupancy.remove(follower, (following.x, following.y))
+        self.leaders.remove(follower)
+
+        following.lead = False
+        self.walkers[leader].lead = True
+        self.meetings.append(merged)
@@ -0,0 +1,161 @@
+# file: states.py
+# purpose: keeps the state of every player in the level in parallel arrays with one entry per player: the cell they
+#          are in and the cell they are sliding from, the way they last stepped, their 'every other' turn, their found
+#          and lead flags, their moves, and where and in which animation frame they are drawn. every player is brought
+#          up to date in one pass over the arrays each frame, so the player sprites are only views the camera draws
+#          from, and each player takes a few dozen bytes however many there are
+
+import array
+
+from settings import *
+from simulation import DOWN
+
+NO_DIRECTION = -1  # the direction of a player that hasn't stepped yet
+ANIMATIONS = 8  # animations every character has: facing each of the four directions, standing idle or walking
+ANIMATION_SPEED = 4  # animation frames shown per second
+
+
+# the pixel center of a cell along one axis
+def center(cell):
+    return cell * TILE_SIZE + TILE_SIZE / 2
+
+
+# the animation a player is drawn with, as an index into a character's animations: the way they face, and whether
+# they are walking
+def animation(facing, sliding):
+    return facing * 2 + sliding
+
+
+class PlayerStates:
+    def __init__(self):
+        self.count = 0  # the amount of players
+
+        # the simulation's side: what the simulation last said about each player
+        self.x = array.array('H')  # column of the cell the player is in, or sliding to
+        self.y = array.array('H')  # row of the cell the player is in, or sliding to
+        self.direction = array.array('b')  # direction code of the player group's last step, or NO_DIRECTION
+        self.turn = array.array('B')  # 0 for a vertical step next, 1 for a horizontal step next ('every other' only)
+        self.found = array.array('B')  # 1 once the player has found another player
+        self.lead = array.array('B')  # 1 while the player leads a group of found players
+        self.moves = array.array('I')  # the amount of moves the player made before meeting another player
+
+        # where each player starts: the cell they were placed in, and their first 'every other' turn
+        self.start_x = array.array('H')
+        self.start_y = array.array('H')
+        self.start_turn = array.array('B')
+
+        # the drawing side: the slide from the cell the player was in to the one they are in, and their animation
+        self.origin_x = array.array('H')  # column of the cell the player is sliding from
+        self.origin_y = array.array('H')  # row of the cell the player is sliding from
+        self.sliding = array.array('B')  # 1 while the player is still sliding towards their cell
+        self.facing = array.array('B')  # direction code the player is drawn facing
+        self.pos_x = array.array('d')  # pixel center the player is drawn at
+        self.pos_y = array.array('d')
+        self.frame = array.array('d')  # animation frame index, counting up ANIMATION_SPEED frames a second
+        self.frames = array.array('B')  # how many frames each of the player's ANIMATIONS has, ANIMATIONS per player
+
+    # add a player who starts in a cell with an 'every other' turn, and whose animations have `frames` frames each
+    # (see animation). returns the player's index
+    def add(self, cell, turn, frames):
+        for column in (self.x, self.y, self.direction, self.turn, self.found, self.lead, self.moves, self.start_x,
+                       self.start_y, self.start_turn, self.origin_x, self.origin_y, self.sliding, self.facing,
+                       self.pos_x, self.pos_y, self.frame):
+            column.append(0)
+        self.frames.extend(frames)
+        self.count += 1
+
+        index = self.count - 1
+        self.start_turn[index] = turn
+        self.set_start(index, cell)
+        self.reset_player(index)
+        return index
+
+    # start a player in a cell, and put them there straight away
+    def set_start(self, index, cell):
+        self.start_x[index], self.start_y[index] = cell
+        self.x[index] = self.origin_x[index] = cell[0]
+        self.y[index] = self.origin_y[index] = cell[1]
+        self.pos_x[index] = center(cell[0])
+        self.pos_y[index] = center(cell[1])
+
+    # put a player back in their starting cell, standing still facing down with their statistics cleared
+    def reset_player(self, index):
+        self.set_start(index, (self.start_x[index], self.start_y[index]))
+        self.direction[index] = NO_DIRECTION
+        self.turn[index] = self.start_turn[index]
+        self.found[index] = self.lead[index] = self.moves[index] = 0
+        self.sliding[index] = 0
+        self.facing[index] = DOWN
+
+    # put every player back in their starting cell
+    def reset(self):
+        for index in range(self.count):
+            self.reset_player(index)
+
+    # copy every player's state out of the simulation after it stepped. each player is sent to wherever their group's
+    # leader is, facing the way the leader last stepped, and the slide there starts from the cell they were going to
+    def sync(self, simulation):
+        walkers = simulation.walkers
+        find = simulation.groups.find
+        for index in range(self.count):
+            walker = walkers[index]
+            leader = walkers[find(index)]
+            self.origin_x[index] = self.x[index]
+            self.origin_y[index] = self.y[index]
+            self.x[index] = leader.x
+            self.y[index] = leader.y
+            self.sliding[index] = self.x[index] != self.origin_x[index] or self.y[index] != self.origin_y[index]
+            if leader.direction is not None:
+                self.direction[index] = self.facing[index] = leader.direction
+
+            self.turn[index] = walker.turn
+            self.found[index] = walker.found
+            self.lead[index] = walker.lead
+            self.moves[index] = walker.moves
+
+    # bring every player's drawing up to date in one pass: move their animations on by dt seconds, and put the players
+    # that are sliding `progress` of the way along their slide (from 0, still in the cell they slid from, to 1, in
+    # their cell). with no progress, nobody is sliding yet
+    def update(self, dt, progress=None):
+        frames = self.frames
+        step = ANIMATION_SPEED * dt
+        for index in range(self.count):
+            if self.sliding[index] and progress is not None:
+                if progress >= 1:
+                    self.arrive_player(index)
+                else:
+                    start_x = center(self.origin_x[index])
+                    start_y = center(self.origin_y[index])
+                    self.pos_x[index] = start_x + (center(self.x[index]) - start_x) * progress
+                    self.pos_y[index] = start_y + (center(self.y[index]) - start_y) * progress
+
+            frame = self.frame[index] + step
+            if frame >= frames[index * ANIMATIONS + animation(self.facing[index], self.sliding[index])]:
+                frame = 0
+            self.frame[index] = frame
+
+    # finish a player's slide straight away, with them in their cell
+    def arrive_player(self, index):
+        self.origin_x[index] = self.x[index]
+        self.origin_y[index] = self.y[index]
+        self.pos_x[index] = center(self.x[index])
+        self.pos_y[index] = center(self.y[index])
+        self.sliding[index] = 0
+
+    # finish every slide straight away
+    def arrive(self):
+        for index in range(self.count):
+            self.arrive_player(index)
+
+    # True while any player is still sliding towards their cell
+    def moving(self):
+        return any(self.sliding)
+
+    # seconds until any player looks different on their own: straight away while someone is sliding, otherwise when
+    # the first animation moves on to its next frame, or None if every animation is a single frame
+    def next_change(self):
+        if self.moving():
+            return 0
+        changes = [(int(self.frame[index]) + 1 - self.frame[index]) / ANIMATION_SPEED for index in range(self.count)
+                   if self.frames[index * ANIMATIONS + animation(self.facing[index], 0)] > 1]
+        return min(changes, default=None)
@@ -0,0 +1,107 @@
+# file: streams.py
+# purpose: seeded random numbers for the simulation. every game has a seed, and every player in it gets their own
+#          stream of random numbers spawned from that seed, so a game can be played again exactly from its seed and
+#          one player's draws never depend on how many draws the others made. the draws are made in blocks ahead of
+#          time, so taking one is just reading the next number from a list
+
+import hashlib
+import random
+
+from settings import *
+
+BLOCK_SIZE = 1024  # how many random numbers a stream draws at once
+
+session = {'games': 0}  # the session seed, once it is picked, and how many games have been seeded from it
+
+
+# the seed the session's games are seeded from: SEED from the settings, or a new one every time the game is started
+def session_seed():
+    if 'seed' not in session:
+        session['seed'] = SEED if SEED is not None else random.SystemRandom().randrange(1_000_000_000)
+    return session['seed']
+
+
+# the seed for the next game: the session seed for the first game, then counting up from it. setting SEED to the seed
+# shown in the overlay plays that game again as the first game
+def next_game_seed():
+    seed = session_seed() + session['games']
+    session['games'] += 1
+    return seed
+
+
+# the seed for stream `index` spawned from `seed`, made by hashing the two together so streams next to each other (and
+# games with seeds next to each other) are unrelated
+def spawn_seed(seed, index):
+    digest = hashlib.blake2b('{}/{}'.format(seed, index).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+# one independent stream for each of `count` players, all spawned from the game's seed
+def spawn(seed, count):
+    return [Stream(spawn_seed(seed, index)) for index in range(count)]
+
+
+# a player's random numbers. works anywhere the random module's randint is used
+class Stream:
+    def __init__(self, seed, block_size=BLOCK_SIZE):
+        self.seed = seed
+        self.block_size = block_size
+        self.reset()
+
+    # go back to the first number of the stream
+    def reset(self):
+        self.rng = random.Random(self.seed)
+        self.block = []  # numbers between 0 and 1 drawn ahead of time, the next one last so it can be popped off
+        self.next = self.block.pop  # takes the next number off the block
+        self.blocks = 0  # how many blocks have been drawn
+        self.target = None  # the position a seek is going to, until the stream catches up to it
+
+    # draw the next block of numbers between 0 and 1, catching up to a seek first
+    def refill(self):
+        if self.target is not None:
+            self.catch_up()
+            if self.block:
+                return
+        draw = self.rng.random
+        self.block = [draw() for _ in range(self.block_size)]
+        self.block.reverse()
+        self.next = self.block.pop
+        self.blocks += 1
+
+    # how many numbers have been taken from the stream
+    def position(self):
+        if self.target is not None:
+            return self.target
+        return self.blocks * self.block_size - len(self.block)
+
+    # go to the number at a position, so the next number taken is the same one it was when the stream was there before.
+    # the numbers before it are only drawn when the next number is taken, so seeking takes the same time wherever it
+    # goes, and costs nothing at all for a stream that isn't used again, like while a replay plays its recorded moves
+    def seek(self, position):
+        self.reset()
+        self.target = position
+
+    # draw every number before the position a seek went to
+    def catch_up(self):
+        blocks, taken = divmod(self.target, self.block_size)
+        self.target = None
+        draw = self.rng.random
+        for _ in range(blocks * self.block_size):
+            draw()
+        self.blocks = blocks
+        if taken:
+            self.refill()
+            del self.block[len(self.block) - taken:]
+
+    # the next number between 0 and 1
+    def random(self):
+        if not self.block:
+            self.refill()
+        return self.next()
+
+    # a whole number from a to b, including both. every protocol scales the same draw, so games played with different
+    # protocols from the same seed use the same random numbers
+    def randint(self, a, b):
+        if not self.block:
+            self.refill()
+        return a + int(self.next() * (b - a + 1))
@@ -1,17 +1,168 @@
 # file: support.py
-# purpose: supports file imports for importing player graphics
+# purpose: loads the game's graphics and sounds. files are listed in the graphics manifest and found relative to the
+#          project folder, and each character's frames are loaded only once, packed into one atlas surface that every
+#          player drawn as that character shares. when the graphics have been packed into an asset bundle (see
+#          bundle.py), the atlases and icons are made straight from the bundle's pixels instead of decoding the pngs
 
-from os import walk
+import json
+import mmap
+import os
+import struct
 import pygame
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # the project folder the code folder is in
 
-def import_folder(path):
-    surface_list = []
+BUNDLE_PATH = os.path.join(ROOT, 'graphics', 'assets.bundle')  # where bundle.py packs the graphics
+BUNDLE_MAGIC = b'WOODSAB1'  # the first bytes of an asset bundle
+BUNDLE_HEADER = '<8sI'  # the magic bytes, then the length of the index
+BUNDLE_FORMAT = 'BGRA'  # the order of the bytes of each pixel in a bundle, the same as a converted surface with alpha
+BUNDLE_ALIGN = 16  # the pixels start on a multiple of this many bytes after the index
 
-    for _, _, img_files in walk(path):
-        for image in img_files:
-            full_path = path + '/' + image
-            image_surf = pygame.image.load(full_path).convert_alpha()
-            surface_list.append(image_surf)
+manifest = {}  # what's in the graphics folder, read from manifest.json the first time it is needed
+bundle = {}  # the asset bundle's mapped file and index, or an index of None if there is no bundle to use
+characters = {}  # character name -> animation name -> frames, all subsurfaces of the character's atlas
+icons = {}  # character name -> the picture of them shown on the overlay
 
-    return surface_list
+
+# the full path to a file in the project, like asset_path('sound', 'music.mp3')
+def asset_path(*parts):
+    return os.path.join(ROOT, *parts)
+
+
+# the graphics manifest, which names every frame of every animation so nothing has to search the folders
+def graphics_manifest():
+    if not manifest:
+        with open(asset_path('graphics', 'manifest.json')) as file:
+            manifest.update(json.load(file))
+    return manifest
+
+
+# the asset bundle's index, with the bundle mapped into memory the first time it is asked for. a missing bundle, one
+# that is cut short or corrupt, or one packed from a different manifest, isn't used, and everything is loaded from the
+# pngs instead
+def bundle_index():
+    if 'index' not in bundle:
+        bundle['index'] = None
+        if os.path.exists(BUNDLE_PATH):
+            try:
+                mapped, length, index = read_bundle()
+            except (OSError, struct.error, ValueError, KeyError, TypeError, AttributeError):
+                return None
+            if index is not None:
+                bundle['file'] = mapped
+                bundle['pixels'] = pixels_start(length)
+                bundle['index'] = index
+    return bundle['index']
+
+
+# map the bundle into memory and read its index. nothing in it is trusted until the magic bytes, the manifest it was
+# packed from, and where every image and frame is have been checked against the file
+# returns the mapped file, the length of the index, and the index, which is None if the file isn't a usable bundle
+def read_bundle():
+    start = struct.calcsize(BUNDLE_HEADER)
+    with open(BUNDLE_PATH, 'rb') as file:
+        if os.fstat(file.fileno()).st_size < start or file.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+            return None, 0, None
+        # copy on write, since surfaces want memory they could draw on; nothing is read until it is used
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    magic, length = struct.unpack_from(BUNDLE_HEADER, mapped)
+    if start + length > len(mapped):
+        return None, 0, None
+    index = json.loads(mapped[start:start + length])
+    if index['manifest'] != graphics_manifest():
+        return None, 0, None
+
+    # the same characters, animations, and frame counts as the manifest, and icons for the same characters
+    characters = graphics_manifest()['characters']
+    manifest_icons = graphics_manifest()['icons']
+    if index['characters'].keys() != characters.keys() or index['icons'].keys() != manifest_icons.keys():
+        return None, 0, None
+    for name, character in index['characters'].items():
+        counts = {animation: len(frames) for animation, frames in character['frames'].items()}
+        if counts != {animation: len(frames) for animation, frames in characters[name].items()}:
+            return None, 0, None
+
+    # every atlas and icon inside the file, and every frame inside its atlas
+    images = [character['atlas'] for character in index['characters'].values()] + list(index['icons'].values())
+    for offset, width, height in images:
+        if not whole_numbers(offset, width, height) or pixels_start(length) + offset + width * height * 4 > len(mapped):
+            return None, 0, None
+    for character in index['characters'].values():
+        _, atlas_width, atlas_height = character['atlas']
+        for frames in character['frames'].values():
+            for x, y, width, height in frames:
+                if not whole_numbers(x, y, width, height) or x + width > atlas_width or y + height > atlas_height:
+                    return None, 0, None
+    return mapped, length, index
+
+
+# True when every value is a whole number that isn't negative, like every offset and size in a bundle's index
+def whole_numbers(*values):
+    return all(type(value) is int and value >= 0 for value in values)
+
+
+# where the pixels start in a bundle with an index `length` bytes long
+def pixels_start(length):
+    return -(-(struct.calcsize(BUNDLE_HEADER) + length) // BUNDLE_ALIGN) * BUNDLE_ALIGN
+
+
+# a surface drawn straight from the pixels in the mapped bundle, without copying or decoding them
+# entry is the [offset, width, height] the index gives for the image, with the offset counted from the start of the
+# pixels
+def bundle_image(entry):
+    offset, width, height = entry
+    offset += bundle['pixels']
+    return pygame.image.frombuffer(memoryview(bundle['file'])[offset:offset + width * height * 4], (width, height),
+                                   BUNDLE_FORMAT)
+
+
+def load_image(name):
+    return pygame.image.load(asset_path('graphics', *name.split('/'))).convert_alpha()
+
+
+# load a character's frames from the pngs and draw them onto one atlas surface, a row per animation
+# returns the atlas and, for each animation, the part of the atlas each frame is in as [x, y, width, height]
+def pack_character(name):
+    images = {animation: [load_image(frame) for frame in frames]
+              for animation, frames in graphics_manifest()['characters'][name].items()}
+    width = max(sum(image.get_width() for image in row) for row in images.values())
+    height = sum(max(image.get_height() for image in row) for row in images.values())
+    atlas = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+
+    areas = {}
+    y = 0
+    for animation, row in images.items():
+        areas[animation] = []
+        x = 0
+        for image in row:
+            atlas.blit(image, (x, y))
+            areas[animation].append([x, y, image.get_width(), image.get_height()])
+            x += image.get_width()
+        y += max(image.get_height() for image in row)
+    return atlas, areas
+
+
+# every animation of a character. the first time a character is asked for, its atlas is made (from the bundle if there
+# is one) and each frame handed out is a subsurface of that atlas, so every player (and every level played since the
+# game started) shares the same pixels
+def character_frames(name):
+    if name not in characters:
+        if bundle_index():
+            entry = bundle_index()['characters'][name]
+            atlas, areas = bundle_image(entry['atlas']), entry['frames']
+        else:
+            atlas, areas = pack_character(name)
+        characters[name] = {animation: [atlas.subsurface(area) for area in frames] for animation, frames in
+                            areas.items()}
+    return characters[name]
+
+
+# the overlay picture of a character, loaded the first time it is asked for
+def character_icon(name):
+    if name not in icons:
+        if bundle_index():
+            icons[name] = bundle_image(bundle_index()['icons'][name])
+        else:
+            icons[name] = load_image(graphics_manifest()['icons'][name])
+    return icons[name]
@@ -0,0 +1,129 @@
+# file: sweep.py
+# purpose: runs the batch simulation over every configuration the menu allows (grid width and height, number of players,
+#          wandering protocol, and start positions), split across all cores, and streams the results to a csv file
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+
+import batch
+from simulation import PROTOCOLS, default_starts
+
+# the ranges the menu lets students pick from
+MIN_SIZE = 2
+MAX_SIZE = 12
+PLAYER_COUNTS = [2, 3, 4]
+MAX_PLAYERS = max(PLAYER_COUNTS)
+
+COLUMNS = ['width', 'height', 'players', 'protocol', 'starts', 'trials', 'finished', 'mean', 'median', 'p95'] + \
+          ['moves{}'.format(player + 1) for player in range(MAX_PLAYERS)]
+
+
+# start positions to try on a grid: the corners the level uses when players aren't placed by hand, plus `placements`
+# randomly drawn sets of start cells standing in for the ways students place the players themselves
+def start_positions(width, height, player_num, placements, rng):
+    positions = [default_starts(width, height, player_num)]
+    for _ in range(placements):
+        cells = rng.integers(0, width * height, size=player_num)
+        positions.append([(int(cell % width), int(cell // width)) for cell in cells])
+    return positions
+
+
+# every (width, height, players, protocol, starts) configuration in the sweep
+def configurations(widths, heights, player_counts, protocols, placements, seed):
+    rng = np.random.default_rng(seed)
+    for width, height, player_num in itertools.product(widths, heights, player_counts):
+        for starts in start_positions(width, height, player_num, placements, rng):
+            for protocol in protocols:
+                yield width, height, player_num, protocol, starts
+
+
+# worker: simulate one configuration and return its csv row
+def run_configuration(job):
+    (width, height, player_num, protocol, starts), trials, max_steps, seed = job
+    steps, moves = batch.run_batch(width, height, protocol, player_num, trials, starts, max_steps=max_steps,
+                                   seed=seed)
+    summary = batch.summarize(steps)
+
+    row = {'width': width, 'height': height, 'players': player_num, 'protocol': protocol,
+           'starts': ' '.join('{},{}'.format(x, y) for x, y in starts), 'trials': summary['trials'],
+           'finished': summary['finished'], 'mean': summary['mean'], 'median': summary['median'],
+           'p95': summary['p95']}
+    for player in range(MAX_PLAYERS):
+        row['moves{}'.format(player + 1)] = float(moves[:, player].mean()) if player < player_num else ''
+    return row
+
+
+# run the sweep, writing each configuration's row to the csv file as soon as a worker finishes it
+# returns the rows in the order they finished
+def sweep(path, widths, heights, player_counts, protocols, placements=0, trials=10000, max_steps=batch.MAX_STEPS,
+          seed=None, processes=None):
+    jobs = list(configurations(widths, heights, player_counts, protocols, placements, seed))
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs))  # independent random streams for every configuration
+    jobs = [(job, trials, max_steps, job_seed) for job, job_seed in zip(jobs, seeds)]
+
+    rows = []
+    with open(path, 'w', newline='') as file, multiprocessing.Pool(processes) as pool:
+        writer = csv.DictWriter(file, fieldnames=COLUMNS)
+        writer.writeheader()
+        for row in pool.imap_unordered(run_configuration, jobs):
+            writer.writerow(row)
+            file.flush()
+            rows.append(row)
+            print('{}/{} {} x {}, {} players, {}: mean {:.1f} steps'.format(
+                len(rows), len(jobs), row['width'], row['height'], row['players'], row['protocol'], row['mean']))
+
+    return rows
+
+
+# save the rows column by column to a numpy .npz file
+def save_npz(path, rows):
+    columns = {}
+    for column in COLUMNS:
+        values = [row[column] for row in rows]
+        if column.startswith('moves'):
+            values = [np.nan if value == '' else value for value in values]
+        columns[column] = np.array(values)
+    np.savez_compressed(path, **columns)
+
+
+# save the rows to a parquet file; pyarrow is only needed when this is used
+def save_parquet(path, rows):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit('saving parquet files needs pyarrow: pip install pyarrow')
+
+    columns = {column: [None if row[column] == '' else row[column] for row in rows] for column in COLUMNS}
+    pyarrow.parquet.write_table(pyarrow.table(columns), path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sweep the meeting time over every grid size, player count, and '
+                                                 'protocol the menu allows.')
+    parser.add_argument('output', help='csv file the results are streamed to')
+    parser.add_argument('--npz', help='also save the results to this numpy .npz file')
+    parser.add_argument('--parquet', help='also save the results to this parquet file (needs pyarrow)')
+    parser.add_argument('--widths', type=int, nargs='+', default=list(range(MIN_SIZE, MAX_SIZE + 1)))
+    parser.add_argument('--heights', type=int, nargs='+', default=list(range(MIN_SIZE, MAX_SIZE + 1)))
+    parser.add_argument('--players', type=int, nargs='+', default=PLAYER_COUNTS)
+    parser.add_argument('--protocols', nargs='+', choices=PROTOCOLS, default=PROTOCOLS)
+    parser.add_argument('--placements', type=int, default=0,
+                        help='random start placements to try per grid, on top of the corners')
+    parser.add_argument('--trials', type=int, default=10000, help='games simulated per configuration')
+    parser.add_argument('--max-steps', type=int, default=batch.MAX_STEPS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    results = sweep(args.output, args.widths, args.heights, args.players, args.protocols, args.placements,
+                    args.trials, args.max_steps, args.seed, args.processes)
+    if args.npz:
+        save_npz(args.npz, results)
+    if args.parquet:
+        save_parquet(args.parquet, results)
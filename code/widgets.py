@@ -0,0 +1,136 @@
+# file: widgets.py
+# purpose: the pieces the menu screens (and the replay timeline) are built from. a screen's text and buttons are
+#          rendered once when the screen is made, and only rendered again when a value they show changes. clicks find
+#          the button under the mouse through an index of where the screen's buttons are, instead of testing every button
+#          on every frame
+
+import pygame
+from labels import Label
+
+HIT_CELL_SIZE = 64  # the size of the squares the hit-test index splits the screen into, in pixels
+
+
+# which buttons are in each square of the screen, so finding the button under a point only tests the few buttons that
+# overlap that point's square
+class HitIndex:
+    def __init__(self, cell_size=HIT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> the buttons overlapping that square
+
+    def add(self, button):
+        rect = button.rect
+        for column in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+            for row in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                self.cells.setdefault((column, row), []).append(button)
+
+    # the button at pos, or None if there isn't one there
+    def find(self, pos):
+        for button in self.cells.get((pos[0] // self.cell_size, pos[1] // self.cell_size), []):
+            if button.rect.collidepoint(pos):
+                return button
+        return None
+
+
+# a filled rectangle, like the border and background of the game over box
+class Box:
+    def __init__(self, color, area):
+        self.color = color
+        self.rect = pygame.Rect(area)
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.color, self.rect)
+
+
+# a filled rectangle that can be clicked, with text centered on a point inside it
+class Button:
+    def __init__(self, name, font, color, fill, text, area, center):
+        self.name = name  # what the menu calls the button when it is pressed
+        self.fill = fill
+        self.rect = pygame.Rect(area)  # the part of the screen that can be clicked
+        self.label = Label(font, color, text, center=center)
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.fill, self.rect)
+        self.label.draw(surface)
+
+
+# everything on one menu screen, drawn in the order it was added
+class Screen:
+    def __init__(self, color, fill, trigger=pygame.MOUSEBUTTONUP):
+        self.color = color  # color of the text
+        self.fill = fill  # color of the buttons
+        self.trigger = trigger  # the mouse event that presses the buttons on this screen
+        self.widgets = []  # boxes, labels, and buttons, in drawing order
+        self.labels = {}  # name -> label, for the text that changes
+        self.index = HitIndex()
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def box(self, color, area):
+        return self.add(Box(color, area))
+
+    # text placed with a pygame rect anchor; naming it lets the text be changed later with set
+    def label(self, font, value, name=None, **anchor):
+        label = self.add(Label(font, self.color, value, **anchor))
+        if name is not None:
+            self.labels[name] = label
+        return label
+
+    def button(self, name, font, text, area, center):
+        button = self.add(Button(name, font, self.color, self.fill, text, area, center))
+        self.index.add(button)
+        return button
+
+    # show a new value on a named label, which is only rendered again if it changed
+    def set(self, name, value):
+        return self.labels[name].set(value)
+
+    # the name of the button the event pressed, or None if it didn't press one
+    def press(self, event):
+        if event.type != self.trigger:
+            return None
+        button = self.index.find(event.pos)
+        return button.name if button is not None else None
+
+    def draw(self, surface):
+        for widget in self.widgets:
+            widget.draw(surface)
+
+
+# a bar with a knob that can be dragged along it with the left mouse button, for picking a value from 0 to 1
+class Slider:
+    def __init__(self, color, fill, area, knob_width=8):
+        self.color = color  # color of the knob
+        self.fill = fill  # color of the bar
+        self.rect = pygame.Rect(area)  # the bar, which can be clicked anywhere to move the knob there
+        self.knob_width = knob_width
+        self.value = 0  # where the knob is, from 0 at the left end to 1 at the right end
+        self.dragging = False  # true while the left mouse button is held after clicking the bar
+
+    # the value of the point on the bar under an x position on the screen
+    def value_at(self, x):
+        return min(1, max(0, (x - self.rect.left) / max(1, self.rect.width)))
+
+    # move the knob, without telling anything it was moved
+    def set(self, value):
+        self.value = min(1, max(0, value))
+
+    # the value the event moved the knob to, or None if it didn't move it
+    def press(self, event):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.rect.collidepoint(event.pos):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+            return None
+        elif event.type != pygame.MOUSEMOTION or not self.dragging:
+            return None
+        self.value = self.value_at(event.pos[0])
+        return self.value
+
+    def draw(self, surface):
+        pygame.draw.rect(surface, self.fill, self.rect)
+        knob = pygame.Rect(0, 0, self.knob_width, self.rect.height)
+        knob.center = (self.rect.left + round(self.value * self.rect.width), self.rect.centery)
+        pygame.draw.rect(surface, self.color, knob.clamp(self.rect))